@@ -1,5 +1,4 @@
-#include <bits/stdc++.h>
-using namespace std;
+#include "../../checklib.h"
 
 /*
 CMS runs checker as:
@@ -9,69 +8,35 @@ Contract:
   - Print a floating-point score to stdout (e.g. "1.0", "0.0").
   - Print messages for contestants/admins to stderr.
   - Always return 0.
-*/
-
-int main(int argc, char *argv[]) {
-  if (argc < 4) {
-    cerr << "Usage: checker <in> <out> <user_out>\n";
-    cout << "0.0\n";
-    return 0;
-  }
 
-  ifstream fin(argv[1]);  // problem input
-  ifstream fans(argv[2]); // correct output
-  ifstream fout(argv[3]); // contestant output
-
-  if (!fin || !fans || !fout) {
-    cerr << "File open error\n";
-    cout << "0.0\n";
-    return 0;
-  }
+Only the maximum (and, in subtask 5, the stop index) are compared, so the
+input file is never read. `checker --batch` grades many triples at once
+(see checklib.h).
+*/
 
-  int N;
-  fin >> N;
-  vector<int> on(N), off(N);
-  for (int i = 0; i < N; i++) {
-    fin >> on[i];
+checklib::Result check(checklib::Case &c) {
+  long long correct_max, user_max;
+  if (!c.ans.read_int(correct_max)) {
+    return checklib::reject("Correct output is malformed");
   }
-  for (int i = 0; i < N; i++) {
-    fin >> off[i];
+  if (!c.out.read_int(user_max)) {
+    return checklib::reject("Output missing first number");
   }
-  long long C;
-  fin >> C;
-
-  long long correct_max;
-  fans >> correct_max;
-
-  long long user_max;
-  if (!(fout >> user_max)) {
-    cerr << "Output missing first number\n";
-    cout << "0.0\n";
-    return 0;
-  }
-
   if (user_max != correct_max) {
-    cerr << "Answer isn't correct\n";
-    cout << "0.0\n";
-    return 0;
+    return checklib::reject();
   }
 
   long long correct_index;
-  if (fans >> correct_index) {
+  if (c.ans.read_int(correct_index)) {
     long long user_index;
-    if (!(fout >> user_index)) {
-      cerr << "Expected an index in output\n";
-      cout << "0.0\n";
-      return 0;
+    if (!c.out.read_int(user_index)) {
+      return checklib::reject("Expected an index in output");
     }
     if (user_index != correct_index) {
-      cerr << "Answer isn't correct\n";
-      cout << "0.0\n";
-      return 0;
+      return checklib::reject();
     }
   }
+  return checklib::accept();
+}
 
-  cerr << "Output is correct\n";
-  cout << "1.0\n";
-  return 0;
-}
\ No newline at end of file
+int main(int argc, char *argv[]) { return checklib::main(argc, argv, check); }
@@ -20,10 +20,24 @@
 # Output format:
 #   Subtasks 1–4:  max_students
 #   Subtask 5:     max_students stop_index   (1-based first index of the max)
+#
+# Stress tier (--stress, N up to 1e7, beyond the statement limits):
+#   written to ../stress/{input,output} by a chunked single-pass pipeline
+#   (generate -> normalize -> solve -> write) with flat memory in N.
+#   Its capped cases board slightly more than leave on average and set C
+#   so the bus first fills up only near the last stop.
+#
+# Unchanged cases are skipped via ../../gencache.py (--force rebuilds all):
+# a case's key is its subtask builder's source, the RNG state the builder
+# starts from and the case's position, plus the solver/writer sources.
 
+import argparse
 import os
 import random
-from typing import List, Tuple
+import shutil
+import sys
+import tempfile
+from typing import Iterator, List, Tuple
 
 # --------------------- Global parameters ---------------------
 BIG_C = 10**9         # "infinite" capacity for S1–S3 & S5
@@ -35,10 +49,18 @@ SEED_BASE  = 20250919 # reproducible
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 IN_DIR  = os.path.join(SCRIPT_DIR, "..", "input")
 OUT_DIR = os.path.join(SCRIPT_DIR, "..", "output")
+STRESS_IN_DIR  = os.path.join(SCRIPT_DIR, "..", "stress", "input")
+STRESS_OUT_DIR = os.path.join(SCRIPT_DIR, "..", "stress", "output")
+
+STREAM_CHUNK = 1 << 16  # stops generated/written per chunk in streaming mode
 
 os.makedirs(IN_DIR, exist_ok=True)
 os.makedirs(OUT_DIR, exist_ok=True)
 
+sys.path.insert(0, os.path.join(SCRIPT_DIR, "..", ".."))
+import genio
+from gencache import GenCache, rng_digest
+
 # --------------------- Helpers ---------------------
 
 def write_case(idx: int, n: int, on: List[int], off: List[int], C: int,
@@ -48,15 +70,14 @@ def write_case(idx: int, n: int, on: List[int], off: List[int], C: int,
     inp_path = os.path.join(IN_DIR,  f"input{idx - 1}.txt")
     out_path = os.path.join(OUT_DIR, f"output{idx - 1}.txt")
 
-    with open(inp_path, "w") as f:
+    with genio.atomic_open(inp_path) as f:
         f.write(str(n) + "\n")
-        f.write(" ".join(map(str, on)) + "\n")
-        f.write(" ".join(map(str, off)) + "\n")
+        genio.write_ints(f, on)
+        genio.write_ints(f, off)
         f.write(str(C) + "\n")
 
     ans_line = solve(on, off, C, need_index)
-    with open(out_path, "w") as f:
-        f.write(ans_line + "\n")
+    genio.write_text(out_path, ans_line + "\n")
 
 
 def solve(on: List[int], off: List[int], C: int, need_index: bool) -> str:
@@ -127,6 +148,89 @@ def bounded_random_case(n: int, maxv: int, C: int, rng: random.Random) -> Tuple[
     return on, off, C
 
 
+# --------------------- Streaming pipeline ---------------------
+
+def random_chunks(n: int, max_on: int, max_off: int,
+                  seed: int) -> Iterator[Tuple[List[int], List[int]]]:
+    """Raw (on, off) chunks in [0, max_on] and [0, max_off]; on and off use separate streams."""
+    rng_on = random.Random(seed)
+    rng_off = random.Random(seed + 1)
+    on_values = range(max_on + 1)
+    off_values = range(max_off + 1)
+    for lo in range(0, n, STREAM_CHUNK):
+        k = min(STREAM_CHUNK, n - lo)
+        yield rng_on.choices(on_values, k=k), rng_off.choices(off_values, k=k)
+
+
+def stream_case(idx: int, n: int, chunks: Iterator[Tuple[List[int], List[int]]],
+                C: int, need_index: bool):
+    """
+    Streaming write_case: normalize (like normalize_nonnegative), solve (like
+    solve) and write each chunk as it arrives. The off line is spilled to a
+    temporary file and appended after the on line, so only one chunk is held
+    in memory whatever N is.
+    """
+    inp_path = os.path.join(STRESS_IN_DIR,  f"input{idx - 1}.txt")
+    out_path = os.path.join(STRESS_OUT_DIR, f"output{idx - 1}.txt")
+
+    cur = 0
+    best = 0
+    best_idx = 1
+    i = 0
+    with genio.atomic_open(inp_path) as f, \
+         tempfile.TemporaryFile("w+", dir=STRESS_IN_DIR) as off_spill:
+        f.write(str(n) + "\n")
+        sep = ""
+        for on, off in chunks:
+            for j in range(len(on)):
+                # Off first, never more than are on board
+                if off[j] > cur:
+                    off[j] = cur
+                cur -= off[j]
+                # On with capacity cap (cur <= C always holds)
+                cur += min(C - cur, on[j])
+                i += 1
+                if cur > best:
+                    best = cur
+                    best_idx = i
+            f.write(sep + " ".join(map(str, on)))
+            off_spill.write(sep + " ".join(map(str, off)))
+            sep = " "
+        assert i == n, f"chunks produced {i} stops, expected {n}"
+        f.write("\n")
+        off_spill.seek(0)
+        shutil.copyfileobj(off_spill, f)
+        f.write("\n" + str(C) + "\n")
+
+    ans_line = f"{best} {best_idx}" if need_index else f"{best}"
+    genio.write_text(out_path, ans_line + "\n")
+
+
+def late_capacity(n: int, max_on: int, max_off: int, fraction: float) -> int:
+    """
+    C reached after about fraction * n stops: with max_on > max_off the
+    occupancy drifts up by (max_on - max_off) / 2 per stop, which at these
+    N is far larger than the random walk's spread around it.
+    """
+    return int(fraction * n * (max_on - max_off) / 2)
+
+
+def stress_cases() -> List[Tuple[int, int, int, int, bool, int]]:
+    """
+    (n, max_on, max_off, C, need_index, seed) for the large-N tier. The
+    capped cases hit C only near the end, so a solution must carry the
+    capacity through almost every stop.
+    """
+    return [
+        (10**6, MAXV_BIG, MAXV_BIG, BIG_C, False, SEED_BASE + 1),
+        (10**6, MAXV_BIG, MAXV_BIG - 100,
+         late_capacity(10**6, MAXV_BIG, MAXV_BIG - 100, 0.9), False, SEED_BASE + 2),
+        (10**7, MAXV_BIG, MAXV_BIG, BIG_C, True,  SEED_BASE + 3),
+        (10**7, MAXV_BIG, MAXV_BIG - 100,
+         late_capacity(10**7, MAXV_BIG, MAXV_BIG - 100, 0.95), True, SEED_BASE + 4),
+    ]
+
+
 # --------------------- Subtask builders ---------------------
 
 def subtask1_cases() -> List[Tuple[int,List[int],List[int],int,bool]]:
@@ -404,40 +508,102 @@ def subtask5_cases(rng: random.Random) -> List[Tuple[int,List[int],List[int],int
 
 # --------------------- Main orchestrator ---------------------
 
+# Everything a case's files depend on besides its own subtask builder
+CACHE_DEPS = [
+    write_case, solve, normalize_nonnegative, build_from_occupancy,
+    bounded_random_case, BIG_C, MAXV_SMALL, MAXV_BIG,
+]
+STRESS_CACHE_DEPS = [stress_cases, late_capacity, random_chunks, stream_case, STREAM_CHUNK]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate Bus Stops tests.")
+    parser.add_argument("--stress", action="store_true",
+                        help="build the large-N streaming tier into ../stress")
+    parser.add_argument("--force", action="store_true",
+                        help="rebuild every case, ignoring the generation cache")
+    parser.add_argument("--fsync", action="store_true",
+                        help="fsync written files and (once per run) their directories")
+    return parser.parse_args()
+
+
+def cached_write_case(cache: GenCache, idx: int, builder, entry_state, ordinal: int,
+                      n: int, on: List[int], off: List[int], C: int, need_index: bool) -> str:
+    """write_case unless the cache has it; returns a suffix for the log line."""
+    paths = [os.path.join(IN_DIR,  f"input{idx - 1}.txt"),
+             os.path.join(OUT_DIR, f"output{idx - 1}.txt")]
+    key = cache.key(builder, entry_state, ordinal)
+    built, _ = cache.run(idx - 1, paths, key,
+                         lambda: write_case(idx, n, on, off, C, need_index))
+    return "" if built else "  (unchanged)"
+
+
+def main_stress(force: bool):
+    os.makedirs(STRESS_IN_DIR, exist_ok=True)
+    os.makedirs(STRESS_OUT_DIR, exist_ok=True)
+    cache = GenCache(__file__, deps=STRESS_CACHE_DEPS, enabled=not force)
+    index = 1
+    for n, max_on, max_off, C, need_idx, seed in stress_cases():
+        paths = [os.path.join(STRESS_IN_DIR,  f"input{index - 1}.txt"),
+                 os.path.join(STRESS_OUT_DIR, f"output{index - 1}.txt")]
+        key = cache.key(n, max_on, max_off, C, need_idx, seed)
+        built, _ = cache.run(f"stress/{index - 1}", paths, key,
+                             lambda: stream_case(index, n, random_chunks(n, max_on, max_off, seed), C, need_idx))
+        print(f"[ST]  input{index - 1}.txt  N={n}, C={C}" + ("" if built else "  (unchanged)"))
+        index += 1
+    cache.save()
+    genio.sync_dirs()
+    print(f"\nDone. Generated {index - 1} stress tests into:\n  {STRESS_IN_DIR}\n  {STRESS_OUT_DIR}")
+
+
 def main():
+    args = parse_args()
+    genio.configure(args.fsync)
+    if args.stress:
+        main_stress(args.force)
+        return
+
+    cache = GenCache(__file__, deps=CACHE_DEPS, enabled=not args.force)
     rng = random.Random(SEED_BASE)
     index = 1
 
     # Subtask 1
-    for n, on, off, C, need_idx in subtask1_cases():
-        write_case(index, n, on, off, C, need_idx)
-        print(f"[S1]  input{index - 1}.txt  N={n}")
+    for ordinal, (n, on, off, C, need_idx) in enumerate(subtask1_cases()):
+        note = cached_write_case(cache, index, subtask1_cases, None, ordinal, n, on, off, C, need_idx)
+        print(f"[S1]  input{index - 1}.txt  N={n}{note}")
         index += 1
 
     # Subtask 2
-    for n, on, off, C, need_idx in subtask2_cases(rng):
-        write_case(index, n, on, off, C, need_idx)
-        print(f"[S2]  input{index - 1}.txt  N={n}")
+    entry = rng_digest(rng)
+    for ordinal, (n, on, off, C, need_idx) in enumerate(subtask2_cases(rng)):
+        note = cached_write_case(cache, index, subtask2_cases, entry, ordinal, n, on, off, C, need_idx)
+        print(f"[S2]  input{index - 1}.txt  N={n}{note}")
         index += 1
 
     # Subtask 3
-    for n, on, off, C, need_idx in subtask3_cases(rng):
-        write_case(index, n, on, off, C, need_idx)
-        print(f"[S3]  input{index - 1}.txt  N={n}")
+    entry = rng_digest(rng)
+    for ordinal, (n, on, off, C, need_idx) in enumerate(subtask3_cases(rng)):
+        note = cached_write_case(cache, index, subtask3_cases, entry, ordinal, n, on, off, C, need_idx)
+        print(f"[S3]  input{index - 1}.txt  N={n}{note}")
         index += 1
 
     # Subtask 4
-    for n, on, off, C, need_idx in subtask4_cases(rng):
-        write_case(index, n, on, off, C, need_idx)
-        print(f"[S4]  input{index - 1}.txt  N={n}, C={C}")
+    entry = rng_digest(rng)
+    for ordinal, (n, on, off, C, need_idx) in enumerate(subtask4_cases(rng)):
+        note = cached_write_case(cache, index, subtask4_cases, entry, ordinal, n, on, off, C, need_idx)
+        print(f"[S4]  input{index - 1}.txt  N={n}, C={C}{note}")
         index += 1
 
     # Subtask 5
-    for n, on, off, C, need_idx in subtask5_cases(rng):
-        write_case(index, n, on, off, C, need_idx)
-        print(f"[S5]  input{index - 1}.txt  N={n} (index required)")
+    entry = rng_digest(rng)
+    for ordinal, (n, on, off, C, need_idx) in enumerate(subtask5_cases(rng)):
+        note = cached_write_case(cache, index, subtask5_cases, entry, ordinal, n, on, off, C, need_idx)
+        print(f"[S5]  input{index - 1}.txt  N={n} (index required){note}")
         index += 1
 
+    cache.save()
+    genio.sync_dirs()
+
     total = index - 1
     assert total == 39, f"Expected 39 tests, produced {total}"
     print(f"\nDone. Generated {total} tests into:\n  {IN_DIR}\n  {OUT_DIR}")
@@ -1,16 +1,55 @@
-import itertools
-
-_int = lambda: int(next(tokens))
-tokens = iter(open(0).read().split())
-n = _int()
-a = [0] * n
-for i in range(n):
-    a[i] += _int()
-for i in range(n):
-    a[i] -= _int()
-c = _int()
-a[0] = min(a[0], c)
-s = list(itertools.accumulate(a, lambda x, y: min(x + y, c)))
-maxval = max(s)
-idx = s.index(maxval) + 1
-print(maxval, idx)
\ No newline at end of file
+import sys
+from array import array
+from itertools import accumulate, chain, islice
+from operator import sub
+
+# With P_i the prefix sums of on_i - off_i, the capped occupancy
+# s_i = min(s_{i-1} + on_i - off_i, C) is P_i until the first stop where
+# P_i >= C, and C there. Since s never exceeds C, the answer is that stop if
+# it exists, else the first maximum of P; so the stops are scanned BLOCK at a
+# time with accumulate/max, carrying only the last prefix sum, and the scan
+# stops at the first P_i >= C.
+# stdin is read CHUNK bytes at a time and tokenized like split() (any
+# whitespace separates); the on values go into one array('q') and the off
+# values are subtracted from it BLOCK at a time, so it ends up holding
+# on_i - off_i in 8 bytes per stop.
+
+CHUNK = 1 << 20  # bytes per read
+BLOCK = 1 << 16  # stops per step
+
+
+def read_tokens():
+    """Lists of the tokens of stdin, CHUNK bytes at a time."""
+    rest = b""
+    for block in iter(lambda: sys.stdin.buffer.read(CHUNK), b""):
+        toks = (rest + block).split()
+        # the last token may continue in the next block
+        rest = toks.pop() if toks and not block[-1:].isspace() else b""
+        yield toks
+    yield [rest] if rest else []
+
+
+def main():
+    tokens = chain.from_iterable(read_tokens())
+    n = int(next(tokens))
+    diffs = array("q", map(int, islice(tokens, n)))
+    for lo in range(0, n, BLOCK):
+        hi = min(lo + BLOCK, n)
+        diffs[lo:hi] = array("q", map(sub, diffs[lo:hi], map(int, islice(tokens, hi - lo))))
+    c = int(next(tokens))
+
+    best, best_at, p = -1, 0, 0
+    for lo in range(0, n, BLOCK):
+        ps = list(accumulate(diffs[lo:lo + BLOCK], initial=p))
+        del ps[0]
+        top = max(ps)
+        if top >= c:
+            best, best_at = c, lo + next(i for i, v in enumerate(ps) if v >= c) + 1
+            break
+        if top > best:
+            best, best_at = top, lo + ps.index(top) + 1
+        p = ps[-1]
+    print(best, best_at)
+
+
+main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# calibrate.py — data-backed time_limit suggestions per task and language
+#
+# For each task:
+#   - the subtask groups come from the 'Score Parameters' regexes of info.md,
+#   - the heaviest tests of every group (largest inputs, --top per group)
+#     are run --repeat times by every reference solution, serially,
+#   - the startup cost of each language (an empty program built and run
+#     exactly like the solutions: interpreter / JVM start, static binary
+#     load) is measured the same way and subtracted,
+#   - the suggested limit is the slowest intended solution's net CPU time
+#     times --factor, plus its startup, rounded up to 0.1 s.
+# Medians are used throughout, so one noisy run does not move the result.
+#
+# Usage:
+#   python3 calibrate.py                    # all tasks, all languages
+#   python3 calibrate.py tree --factor 3
+#   python3 calibrate.py --lang c cpp java  # languages the limit must fit
+
+import argparse
+import math
+import os
+import re
+import statistics
+import tempfile
+
+from harness import (
+    BUILD_DIR,
+    CompileError,
+    Solution,
+    codename,
+    compile_solution,
+    find_solutions,
+    find_tasks,
+    run_measured,
+    toolchain_missing,
+)
+
+# Minimal programs measuring each language's startup cost.
+EMPTY_PROGRAMS = {
+    "c": ("empty.c", "int main(void) { return 0; }\n"),
+    "cpp": ("empty.cpp", "int main() { return 0; }\n"),
+    "java": ("Empty.java", "public class Empty { public static void main(String[] a) {} }\n"),
+    "py": ("empty.py", ""),
+}
+
+
+def median_cpu(cmd, input_path, repeat, timeout):
+    with tempfile.NamedTemporaryFile() as out:
+        return statistics.median(
+            run_measured(cmd, input_path, out.name, timeout=timeout).cpu for _ in range(repeat))
+
+
+def startup_baseline(task, lang, repeat) -> float:
+    name, source = EMPTY_PROGRAMS[lang]
+    src = os.path.join(BUILD_DIR, "baseline", name)
+    os.makedirs(os.path.dirname(src), exist_ok=True)
+    with open(src, "w") as f:
+        f.write(source)
+    cmd = compile_solution(Solution(task, src, lang))
+    return median_cpu(cmd, os.devnull, repeat, timeout=None)
+
+
+def heaviest_tests(task, top: int) -> dict:
+    """{group index: [test, ...]}, the largest inputs matching each group regex."""
+    tests = task.tests()
+    size = {i: os.path.getsize(task.input_path(i)) for i in tests}
+    groups = task.groups or [(100, ".*")]
+    picked = {}
+    for g, (_, regex) in enumerate(groups):
+        members = [i for i in tests if re.fullmatch(regex, codename(i))]
+        picked[g] = sorted(members, key=lambda i: -size[i])[:top]
+    return picked
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suggest time limits from timed reference solutions.")
+    parser.add_argument("tasks", nargs="*", help="task directories (default: all with a task.yaml)")
+    parser.add_argument("--lang", nargs="+", choices=sorted(EMPTY_PROGRAMS),
+                        help="intended languages the limit must fit (default: all)")
+    parser.add_argument("--factor", type=float, default=2.0,
+                        help="safety factor over the slowest net time (default: 2)")
+    parser.add_argument("--top", type=int, default=2, help="heaviest tests per group (default: 2)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per test (default: 5)")
+    args = parser.parse_args()
+
+    baselines = {}
+    for task in find_tasks(args.tasks):
+        picked = heaviest_tests(task, args.top)
+        tests = sorted(set().union(*picked.values()))
+        print(f"{task.name}: time_limit {task.time_limit:g}s, "
+              f"groups {' | '.join(','.join(map(str, picked[g])) for g in sorted(picked))}")
+        suggestion, slowest = 0.0, None
+        for sol in find_solutions(task, args.lang):
+            missing = toolchain_missing(sol)
+            if missing:
+                print(f"  {sol.label}: skipped ({missing} not installed)")
+                continue
+            try:
+                compile_solution(sol)
+                if sol.lang not in baselines:
+                    baselines[sol.lang] = startup_baseline(task, sol.lang, args.repeat)
+            except CompileError as e:
+                print(f"  {e}")
+                continue
+            base = baselines[sol.lang]
+            cpu = {i: median_cpu(sol.cmd, task.input_path(i), args.repeat,
+                                 timeout=10 * task.time_limit) for i in tests}
+            net = {i: max(0.0, cpu[i] - base) for i in tests}
+            per_group = " ".join(f"{max((net[i] for i in picked[g]), default=0):.3f}"
+                                 for g in sorted(picked))
+            worst = max(tests, key=lambda i: net[i])
+            limit = base + args.factor * net[worst]
+            print(f"  {sol.label}: startup {base:.3f}s, net per group [{per_group}]s, "
+                  f"worst test {worst} {cpu[worst]:.3f}s -> needs {limit:.3f}s")
+            if limit > suggestion:
+                suggestion, slowest = limit, sol.label
+        if slowest:
+            suggested = max(0.1, math.ceil(suggestion * 10) / 10)
+            print(f"  suggested time_limit: {suggested:g}s (x{args.factor:g} over {slowest}; "
+                  f"current {task.time_limit:g}s)")
+
+
+if __name__ == "__main__":
+    main()
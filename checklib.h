@@ -0,0 +1,163 @@
+// checklib.h — shared framework for the */check/checker.cpp checkers
+//
+// A checker only writes its comparison:
+//
+//   #include "../../checklib.h"
+//   checklib::Result check(checklib::Case &c) { ... }
+//   int main(int argc, char *argv[]) { return checklib::main(argc, argv, check); }
+//
+// - Files are opened lazily and read through a fixed buffer, one token at a
+//   time, so a checker reads only what it compares (and never the input if
+//   it does not need it) and stops at the first mismatch.
+// - The contestant output is rejected by size (fstat) before any parsing
+//   when it is larger than Options::max_output_bytes.
+// - CMS single-run contract (unchanged):
+//     checker <input> <correct_output> <contestant_output>
+//   prints the score to stdout and a message to stderr, always exits 0.
+// - Batch mode for local regrading, one process for many triples:
+//     checker --batch < triples
+//   reads the three paths of each triple (input, correct output, contestant
+//   output) one per line, so paths may contain spaces, and prints
+//   "<score> <message>" per triple to stdout.
+
+#ifndef CHECKLIB_H
+#define CHECKLIB_H
+
+#include <sys/stat.h>
+
+#include <cstdio>
+#include <cstring>
+#include <iostream>
+#include <limits>
+#include <string>
+#include <utility>
+
+namespace checklib {
+
+struct Result {
+  double score;
+  std::string message;
+};
+
+inline Result accept(const std::string &message = "Output is correct") { return {1.0, message}; }
+inline Result reject(const std::string &message = "Answer isn't correct") { return {0.0, message}; }
+
+struct Options {
+  long long max_output_bytes = 1 << 20;
+};
+
+class Reader {
+public:
+  explicit Reader(std::string path) : path_(std::move(path)) {}
+  Reader(const Reader &) = delete;
+  Reader &operator=(const Reader &) = delete;
+  ~Reader() {
+    if (f_) fclose(f_);
+  }
+
+  // Opens the file on first use; false if it cannot be opened.
+  bool open() {
+    if (!opened_) {
+      opened_ = true;
+      f_ = fopen(path_.c_str(), "rb");
+    }
+    return f_ != nullptr;
+  }
+
+  // Size in bytes without reading (-1 if it cannot be opened).
+  long long size() {
+    struct stat st;
+    return open() && fstat(fileno(f_), &st) == 0 ? (long long)st.st_size : -1;
+  }
+
+  // Next integer, parsed like `stream >> x`: leading whitespace skipped,
+  // digits read up to the first other character (left unread); false at end
+  // of file, without digits or on overflow.
+  bool read_int(long long &x) {
+    int c = skip_space();
+    if (c == EOF) return false;
+    bool neg = c == '-';
+    if (neg || c == '+') c = get();
+    if (c < '0' || c > '9') return false;
+    unsigned long long v = 0;
+    const unsigned long long cap = (unsigned long long)std::numeric_limits<long long>::max() + neg;
+    for (; c >= '0' && c <= '9'; c = get()) {
+      if (v > (cap - (c - '0')) / 10) return false;
+      v = v * 10 + (c - '0');
+    }
+    if (c != EOF) --pos_;
+    x = neg ? (long long)(0 - v) : (long long)v;
+    return true;
+  }
+
+  // True if only whitespace is left (consumes the next token's first
+  // character otherwise).
+  bool at_end() { return skip_space() == EOF; }
+
+private:
+  static bool is_space(int c) { return c == ' ' || c == '\n' || c == '\r' || c == '\t'; }
+
+  int get() {
+    if (pos_ == len_) {
+      if (!open()) return EOF;
+      len_ = fread(buf_, 1, sizeof buf_, f_);
+      pos_ = 0;
+      if (len_ == 0) return EOF;
+    }
+    return (unsigned char)buf_[pos_++];
+  }
+
+  // Consumes whitespace and returns the first other character (or EOF).
+  int skip_space() {
+    int c;
+    do {
+      c = get();
+    } while (c != EOF && is_space(c));
+    return c;
+  }
+
+  std::string path_;
+  FILE *f_ = nullptr;
+  bool opened_ = false;
+  char buf_[1 << 16];
+  size_t pos_ = 0, len_ = 0;
+};
+
+struct Case {
+  Reader in, ans, out;
+  Case(const char *in_path, const char *ans_path, const char *out_path)
+      : in(in_path), ans(ans_path), out(out_path) {}
+};
+
+template <class Check>
+Result run_one(const char *in, const char *ans, const char *out, Check check, const Options &opt) {
+  Case c(in, ans, out);
+  if (!c.ans.open() || !c.out.open()) return reject("File open error");
+  if (c.out.size() > opt.max_output_bytes) return reject("Output too large");
+  return check(c);
+}
+
+template <class Check>
+int main(int argc, char *argv[], Check check, Options opt = Options()) {
+  if (argc == 2 && strcmp(argv[1], "--batch") == 0) {
+    std::string in, ans, out;
+    while (std::getline(std::cin, in) && std::getline(std::cin, ans) && std::getline(std::cin, out)) {
+      Result r = run_one(in.c_str(), ans.c_str(), out.c_str(), check, opt);
+      printf("%.1f %s\n", r.score, r.message.c_str());
+    }
+    return 0;
+  }
+  if (argc < 4) {
+    fprintf(stderr, "Usage: checker <in> <out> <user_out> | checker --batch\n");
+    printf("0.0\n");
+    return 0;
+  }
+  Result r = run_one(argv[1], argv[2], argv[3], check, opt);
+  fprintf(stderr, "%s\n", r.message.c_str());
+  printf("%.1f\n", r.score);
+  return 0;
+}
+
+}  // namespace checklib
+
+#endif
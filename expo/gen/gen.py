@@ -1,5 +1,13 @@
+import argparse
 import os
 import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, repeat
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+import genio
+from gencache import GenCache
 
 def is_power_of_two(x):
     return (x & (x - 1)) == 0 and x > 0
@@ -19,24 +27,103 @@ def generate_testcase(group_id):
     m = random.randint(1, 10**9)
     return a, b, m
 
-# Ensure directories exist
-os.makedirs("../input", exist_ok=True)
-os.makedirs("../output", exist_ok=True)
-
-# 4 groups × 10 = 40 testcases
-for group in range(4):
-    for i in range(10):
-        idx = group * 10 + i
-        a, b, m = generate_testcase(group)
-        
-        input_file = f"../input/input{idx}.txt"
-        output_file = f"../output/output{idx}.txt"
-        
-        with open(input_file, "w") as f:
-            f.write(f"1\n{a} {b} {m}\n")
-
-        result = pow(a, b, m)
-        with open(output_file, "w") as f:
-            f.write(f"{result}\n")
-
-print("Generated 40 testcases (input0–input39, output0–output39)")
+def write_case(idx, a, b, m):
+    input_file = f"../input/input{idx}.txt"
+    output_file = f"../output/output{idx}.txt"
+
+    genio.write_text(input_file, f"1\n{a} {b} {m}\n")
+
+    result = pow(a, b, m)
+    genio.write_text(output_file, f"{result}\n")
+
+# --------------------- Batched stress tier (--stress) ---------------------
+# Files of up to 1e6 queries (the statement allows t <= 1e5), so that a run
+# measures exponentiation throughput rather than process startup. Queries
+# are drawn by generate_testcase in chunks of STRESS_CHUNK, each from its own
+# seed, and drawn/answered in parallel; the files do not depend on -j.
+
+STRESS_DIR = "../stress"
+STRESS_CHUNK = 1 << 16  # queries per worker task
+STRESS_SEED = 20251017
+
+# (t, group) per stress test
+STRESS_CASES = [
+    (10**5, 3),  # the statement maximum
+    (10**6, 0),
+    (10**6, 2),
+    (10**6, 3),
+]
+
+def stress_chunk(group_id, seed, chunk, count):
+    """Input rows and answers of one chunk of a stress file."""
+    random.seed(f"{seed}:{chunk}")
+    queries = [generate_testcase(group_id) for _ in range(count)]
+    rows = ("%d %d %d\n" * count) % tuple(chain.from_iterable(queries))
+    answers = "".join(f"{pow(a, b, m)}\n" for a, b, m in queries)
+    return rows, answers
+
+def write_stress_case(pool, idx, t, group_id, seed):
+    chunks = range(0, t, STRESS_CHUNK)
+    counts = [min(STRESS_CHUNK, t - start) for start in chunks]
+    parts = pool.map(stress_chunk, repeat(group_id), repeat(seed),
+                     range(len(counts)), counts)
+    with genio.atomic_open(f"{STRESS_DIR}/input/input{idx}.txt") as fin, \
+            genio.atomic_open(f"{STRESS_DIR}/output/output{idx}.txt") as fout:
+        fin.write(f"{t}\n")
+        for rows, answers in parts:
+            fin.write(rows)
+            fout.write(answers)
+
+def main_stress(jobs, force):
+    os.makedirs(f"{STRESS_DIR}/input", exist_ok=True)
+    os.makedirs(f"{STRESS_DIR}/output", exist_ok=True)
+    cache = GenCache(__file__, deps=[generate_testcase, stress_chunk, write_stress_case,
+                                     STRESS_CHUNK], enabled=not force)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for idx, (t, group) in enumerate(STRESS_CASES):
+            paths = [f"{STRESS_DIR}/input/input{idx}.txt", f"{STRESS_DIR}/output/output{idx}.txt"]
+            built, _ = cache.run(f"stress/{idx}", paths, cache.key(t, group, STRESS_SEED + idx),
+                                 lambda: write_stress_case(pool, idx, t, group, STRESS_SEED + idx))
+            print(f"[ST]  input{idx}.txt  t={t}, group={group}" + ("" if built else "  (unchanged)"))
+    cache.save()
+    genio.sync_dirs()
+    print(f"Generated {len(STRESS_CASES)} stress tests in {STRESS_DIR}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate Simple Exponentiation tests.")
+    parser.add_argument("--stress", action="store_true",
+                        help=f"build the batched tier (up to 1e6 queries per file) into {STRESS_DIR}")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="worker processes for --stress (default: number of cores)")
+    parser.add_argument("--force", action="store_true",
+                        help="redraw every case, ignoring the generation cache")
+    parser.add_argument("--fsync", action="store_true",
+                        help="fsync written files and (once per run) their directories")
+    args = parser.parse_args()
+    genio.configure(args.fsync)
+    if args.stress:
+        main_stress(args.jobs, args.force)
+        return
+
+    # Ensure directories exist
+    os.makedirs("../input", exist_ok=True)
+    os.makedirs("../output", exist_ok=True)
+
+    # Cases are unseeded draws, so the cache (../../gencache.py) keeps the
+    # existing ones as long as generate_testcase and write_case are unchanged.
+    cache = GenCache(__file__, deps=[write_case], enabled=not args.force)
+
+    # 4 groups × 10 = 40 testcases
+    for group in range(4):
+        for i in range(10):
+            idx = group * 10 + i
+            paths = [f"../input/input{idx}.txt", f"../output/output{idx}.txt"]
+            cache.run(idx, paths, cache.key(generate_testcase, group),
+                      lambda: write_case(idx, *generate_testcase(group)))
+    cache.save()
+    genio.sync_dirs()
+
+    print("Generated 40 testcases (input0–input39, output0–output39)")
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,29 @@
-for i in range(int(input())):
-  a, b, c = map(int, input().split(' '))
-  print(pow(a, b, c))
\ No newline at end of file
+import json
+import re
+import sys
+
+# All queries are read at once and the answers written with a single write.
+# In between, the input is parsed by json's scanner in newline-aligned slices
+# of about CHUNK bytes (a list of every token would not fit in the memory
+# limit at 1e6 queries), each split like split() on any whitespace and joined
+# with commas; map pulls a, b and m in turn from the same iterator. A query
+# may span lines, so the tokens after the last full triple of a slice are
+# carried over to the next one.
+CHUNK = 1 << 20
+
+data = sys.stdin.buffer.read()
+start = re.match(rb"\s*\S+", data).end()  # past the query count
+answers = []
+rest = []
+while start < len(data):
+    end = data.find(b"\n", start + CHUNK) + 1 or len(data)
+    values = json.loads(b"[%s]" % b",".join(data[start:end].split()))
+    values[:0] = rest
+    whole = len(values) - len(values) % 3
+    rest = values[whole:]
+    del values[whole:]
+    if values:
+        it = iter(values)
+        answers.append("\n".join(map(str, map(pow, it, it, it))))
+    start = end
+sys.stdout.write("\n".join(answers) + "\n")
@@ -14,12 +14,39 @@
 # Notes:
 # - Deterministic via fixed seeds
 # - Ensures (u, t, l) are within problem constraints
-# - Reference solution uses global-rank + Fenwick, O(n log n)
+# - Reference solution uses global-rank + Fenwick, O(n log n); with numpy
+#   installed a columnar merge-sort counter computes the same answers in bulk
+#   (`--engine`, `--cross-check` runs both and compares)
+# - Every case builder owns its RNG, so cases can be built in any order;
+#   `--jobs N` fans them out over a process pool with identical output
+# - `--stress` builds extra 1e6–1e7 post tiers into ../stress with a
+#   NumPy column backend (beyond the statement limits, not for CMS)
+# - Cases whose builder and reference/writer sources are unchanged are
+#   skipped via ../../gencache.py (`--force` rebuilds everything)
 
+import argparse
 import os
 import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Tuple
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+import genio
+from gencache import GenCache
+
+try:
+    import numpy as np
+except ImportError:  # only the --stress tiers need numpy
+    np = None
+
+U_MAX = 10**9
+T_MAX = 10**9
+L_MAX = 100000
+
+STRESS_INPUT_DIR = "../stress/input"
+STRESS_OUTPUT_DIR = "../stress/output"
+
 # ------------------------
 # Reference solver
 # ------------------------
@@ -60,6 +87,66 @@ def solve_reference(posts: List[Tuple[int,int,int,int]], k: int) -> List[int]:
             ans.append(idx1)
     return ans
 
+def count_dominated(seq):
+    """
+    For a permutation seq, cnt[i] = #{j < i : seq[j] < seq[i]}.
+    Bottom-up merge sort: at width w every element of a right block counts
+    the smaller elements of its (already sorted) left block with one
+    searchsorted over all blocks at once, then adjacent blocks are merged.
+    """
+    n = len(seq)
+    cnt = np.zeros(n, dtype=np.int64)
+    pos = np.arange(n, dtype=np.int64)  # original position of each slot
+    vals = np.asarray(seq, dtype=np.int64)
+    slot = np.arange(n, dtype=np.int64)
+    w = 1
+    while w < n:
+        pair = slot // (2 * w)
+        right = ((slot // w) & 1).astype(bool)
+        # offsetting by pair keeps all left blocks in one sorted array
+        keys = pair * n + vals
+        # every earlier pair contributes exactly w left elements
+        cnt[pos[right]] += np.searchsorted(keys[~right], keys[right]) - pair[right] * w
+        order = np.argsort(keys, kind="stable")
+        vals = vals[order]
+        pos = pos[order]
+        w *= 2
+    return cnt
+
+def solve_reference_columns(u, t, l, k: int) -> List[int]:
+    """Same answers as solve_reference, from u/t/l columns in post order."""
+    n = len(u)
+    # lexsort is stable and its last key is the primary one, so ties
+    # fall back to idx asc like the tuple sorts above.
+    order_rank = np.lexsort((u, -t, -l))
+    rank = np.empty(n, dtype=np.int64)
+    rank[order_rank] = np.arange(n, dtype=np.int64)
+    order_time = np.lexsort((u, -l, t))
+    # +1: the post itself is among those seen so far
+    seen_better = count_dominated(rank[order_time]) + 1
+    return (order_time[seen_better <= k] + 1).tolist()
+
+ENGINE = "columns" if np is not None else "fenwick"
+CROSS_CHECK = False
+
+def configure(engine: str, cross_check: bool):
+    global ENGINE, CROSS_CHECK
+    ENGINE = engine
+    CROSS_CHECK = cross_check
+
+def solve_posts_columns(posts_by_idx: List[Tuple[int,int,int,int]], k: int) -> List[int]:
+    cols = np.array(posts_by_idx, dtype=np.int64).reshape(-1, 4)
+    return solve_reference_columns(cols[:, 0], cols[:, 1], cols[:, 2], k)
+
+def reference_answers(posts_by_idx: List[Tuple[int,int,int,int]], k: int) -> List[int]:
+    engines = {"fenwick": solve_reference, "columns": solve_posts_columns}
+    ans = engines[ENGINE](posts_by_idx, k)
+    if CROSS_CHECK:
+        other = "fenwick" if ENGINE == "columns" else "columns"
+        if engines[other](posts_by_idx, k) != ans:
+            raise AssertionError("columnar and Fenwick reference engines disagree")
+    return ans
+
 # ------------------------
 # Utilities
 # ------------------------
@@ -73,15 +160,14 @@ def write_case(case_id: int, posts: List[Tuple[int,int,int,int]], k: int):
     inp_path = f"../input/input{case_id}.txt"
     out_path = f"../output/output{case_id}.txt"
 
-    with open(inp_path, "w") as f:
+    posts_by_idx = sorted(posts, key=lambda x: x[3])
+    with genio.atomic_open(inp_path) as f:
         f.write(f"{n} {k}\n")
-        posts_by_idx = sorted(posts, key=lambda x: x[3])
-        for (u, t, l, idx1) in posts_by_idx:
-            f.write(f"{u} {t} {l}\n")
+        genio.write_rows(f, ((u, t, l) for (u, t, l, idx1) in posts_by_idx))
 
-    ans = solve_reference(posts, k)
-    with open(out_path, "w") as f:
-        f.write(" ".join(map(str, ans)).strip() + "\n")
+    ans = reference_answers(posts_by_idx, k)
+    with genio.atomic_open(out_path) as f:
+        genio.write_ints(f, ans)
 
 def unique_users(n: int, rng: random.Random) -> List[int]:
     # generate n unique user IDs within [1, 1e9]
@@ -100,6 +186,54 @@ def make_posts_from_arrays(u_list, t_list, l_list) -> List[Tuple[int,int,int,int
         posts.append((u, t, l, i + 1))
     return posts
 
+# ------------------------
+# Vectorized backend (stress tiers)
+# ------------------------
+#
+# Posts are kept as three int64 columns u, t, l; the 1-based post index is
+# the row number + 1. Seeds go through numpy's Generator, so these tiers do
+# not share random streams with the contest cases above.
+
+ROW_FMT = "%d %d %d\n"
+WRITE_CHUNK = 1 << 16
+
+def unique_users_np(n: int, gen) -> "np.ndarray":
+    # n distinct user IDs within [1, 1e9]
+    return gen.choice(U_MAX, size=n, replace=False).astype(np.int64) + 1
+
+def make_unique_pairs_np(u, t, gen):
+    """Redraw the user of every repeated (u, t) pair until all pairs are unique."""
+    while True:
+        # u, t < 2^30, so the packed key fits in int64
+        key = (u << 30) | t
+        _, first = np.unique(key, return_index=True)
+        if len(first) == len(u):
+            return u
+        dup = np.ones(len(u), dtype=bool)
+        dup[first] = False
+        u[dup] = gen.integers(1, U_MAX + 1, size=int(dup.sum()), dtype=np.int64)
+
+def write_input_columns(path: str, u, t, l, k: int):
+    n = len(u)
+    rows = np.stack((u, t, l), axis=1)
+    with genio.atomic_open(path) as f:
+        f.write(f"{n} {k}\n")
+        # genio.write_rows would need the rows as Python tuples; format
+        # straight from the array instead
+        for lo in range(0, n, WRITE_CHUNK):
+            block = rows[lo:lo + WRITE_CHUNK]
+            f.write((ROW_FMT * len(block)) % tuple(block.ravel().tolist()))
+
+def write_case_columns(case_id: int, u, t, l, k: int):
+    write_input_columns(f"{STRESS_INPUT_DIR}/input{case_id}.txt", u, t, l, k)
+    ans = solve_reference_columns(u, t, l, k)
+    if CROSS_CHECK:
+        posts = list(zip(u.tolist(), t.tolist(), l.tolist(), range(1, len(u) + 1)))
+        if solve_reference(posts, k) != ans:
+            raise AssertionError("columnar and Fenwick reference engines disagree")
+    with genio.atomic_open(f"{STRESS_OUTPUT_DIR}/output{case_id}.txt") as f:
+        genio.write_ints(f, ans)
+
 # ------------------------
 # Generators per case
 # ------------------------
@@ -226,31 +360,158 @@ def subtask4_full_max(case_id: int) -> int:
     write_case(case_id, posts, k)
     return case_id + 1
 
+# ------------------------
+# Stress tiers (--stress)
+# ------------------------
+
+def stress_random_1e6(case_id: int) -> int:
+    gen = np.random.default_rng(5001)
+    n, k = 10**6, 10**5
+    u = unique_users_np(n, gen)
+    t = gen.integers(0, T_MAX + 1, size=n, dtype=np.int64)
+    l = gen.integers(0, L_MAX + 1, size=n, dtype=np.int64)
+    write_case_columns(case_id, u, t, l, k)
+    return case_id + 1
+
+def stress_heavy_users_1e6(case_id: int) -> int:
+    # few users posting many times: exercises the (u, t) dedup
+    gen = np.random.default_rng(5002)
+    n, k = 10**6, 1000
+    u = gen.integers(1, 1001, size=n, dtype=np.int64)
+    t = gen.integers(0, 10**4, size=n, dtype=np.int64)
+    l = gen.integers(0, L_MAX + 1, size=n, dtype=np.int64)
+    u = make_unique_pairs_np(u, t, gen)
+    write_case_columns(case_id, u, t, l, k)
+    return case_id + 1
+
+def stress_clustered_1e7(case_id: int) -> int:
+    gen = np.random.default_rng(5003)
+    n, k = 10**7, 100
+    clusters = 50
+    u = unique_users_np(n, gen)
+    c = gen.integers(0, clusters, size=n, dtype=np.int64)
+    t = c * 2000 + gen.integers(0, 1000, size=n, dtype=np.int64)
+    lo = np.minimum(c * 2000, L_MAX)
+    hi = np.minimum(c * 2000 + 999, L_MAX)
+    l = lo + (gen.random(size=n) * (hi - lo + 1)).astype(np.int64)
+    write_case_columns(case_id, u, t, l, k)
+    return case_id + 1
+
+def stress_full_1e7(case_id: int) -> int:
+    gen = np.random.default_rng(5004)
+    n = 10**7
+    k = n
+    u = unique_users_np(n, gen)
+    t = gen.integers(0, T_MAX + 1, size=n, dtype=np.int64)
+    l = gen.integers(0, L_MAX + 1, size=n, dtype=np.int64)
+    write_case_columns(case_id, u, t, l, k)
+    return case_id + 1
+
 # ------------------------
 # Main
 # ------------------------
 
-def main():
-    ensure_dirs()
-    cid = 0
+# Case builders in test order; the builder at position K writes inputK/outputK.
+CASE_BUILDERS = [
     # Samples
-    cid = sample1(cid)
-    cid = sample2(cid)
+    sample1,
+    sample2,
     # Subtask 1
-    cid = subtask1_min(cid)
-    cid = subtask1_all_same_t_k1(cid)
-    cid = subtask1_equal_likes_increasing_t_k1(cid)
+    subtask1_min,
+    subtask1_all_same_t_k1,
+    subtask1_equal_likes_increasing_t_k1,
     # Subtask 2
-    cid = subtask2_dense_random(cid)
-    cid = subtask2_decreasing_likes(cid)
-    cid = subtask2_equal_likes_increasing_t(cid)
+    subtask2_dense_random,
+    subtask2_decreasing_likes,
+    subtask2_equal_likes_increasing_t,
     # Subtask 3
-    cid = subtask3_large_clustered(cid)
+    subtask3_large_clustered,
     # Subtask 4
-    cid = subtask4_k_equals_n(cid)
-    cid = subtask4_big_same_time(cid)
-    cid = subtask4_full_max(cid)
-    print(f"Generated {cid} test cases in ../input and ../output")
+    subtask4_k_equals_n,
+    subtask4_big_same_time,
+    subtask4_full_max,
+]
+
+STRESS_BUILDERS = [
+    stress_random_1e6,
+    stress_heavy_users_1e6,
+    stress_clustered_1e7,
+    stress_full_1e7,
+]
+
+# Everything a case's files depend on besides its own builder
+CACHE_DEPS = [
+    Fenwick, solve_reference, count_dominated, solve_reference_columns,
+    solve_posts_columns, reference_answers, write_case, unique_users,
+    make_posts_from_arrays, unique_users_np, make_unique_pairs_np,
+    write_input_columns, write_case_columns, U_MAX, T_MAX, L_MAX,
+    genio.write_ints, genio.write_rows,
+]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate Offthentic Feed tests.")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="number of worker processes (default: 1, serial)")
+    parser.add_argument("--stress", action="store_true",
+                        help="build the 1e6–1e7 stress tiers into ../stress (needs numpy)")
+    parser.add_argument("--engine", choices=("fenwick", "columns"), default=ENGINE,
+                        help=f"reference answer engine (default: {ENGINE})")
+    parser.add_argument("--cross-check", action="store_true",
+                        help="also run the other engine and fail on any difference")
+    parser.add_argument("--force", action="store_true",
+                        help="rebuild every case, ignoring the generation cache")
+    parser.add_argument("--fsync", action="store_true",
+                        help="fsync written files and (once per run) their directories")
+    return parser.parse_args()
+
+def run_builders(builders, in_dir: str, out_dir: str, tag: str, jobs: int,
+                 engine: str, cross_check: bool, cache: GenCache) -> int:
+    """Build every case whose cache entry is stale; returns how many were built."""
+    configure(engine, cross_check)
+    pending = []
+    for cid, builder in enumerate(builders):
+        paths = [f"{in_dir}/input{cid}.txt", f"{out_dir}/output{cid}.txt"]
+        key = cache.key(builder)
+        if not cache.fresh(tag + str(cid), key, paths):
+            pending.append((cid, builder, key, paths))
+    if jobs <= 1:
+        for cid, builder, key, paths in pending:
+            builder(cid)
+            cache.store(tag + str(cid), key, paths)
+    else:
+        # Each builder seeds its own RNG and writes only its own files,
+        # so the result is byte-identical to a serial run.
+        with ProcessPoolExecutor(max_workers=jobs, initializer=configure,
+                                 initargs=(engine, cross_check)) as pool:
+            futures = [pool.submit(builder, cid) for cid, builder, _, _ in pending]
+            for (cid, _, key, paths), f in zip(pending, futures):
+                f.result()
+                cache.store(tag + str(cid), key, paths)
+    cache.save()
+    genio.sync_dirs(in_dir, out_dir)
+    return len(pending)
+
+def main():
+    args = parse_args()
+    genio.configure(args.fsync)
+    cache = GenCache(__file__, deps=CACHE_DEPS, enabled=not args.force)
+    if args.engine == "columns" and np is None:
+        raise SystemExit("--engine columns needs numpy installed")
+    if args.stress:
+        if np is None:
+            raise SystemExit("--stress needs numpy installed")
+        os.makedirs(STRESS_INPUT_DIR, exist_ok=True)
+        os.makedirs(STRESS_OUTPUT_DIR, exist_ok=True)
+        built = run_builders(STRESS_BUILDERS, STRESS_INPUT_DIR, STRESS_OUTPUT_DIR, "stress/",
+                             args.jobs, args.engine, args.cross_check, cache)
+        print(f"Generated {built} stress cases in ../stress "
+              f"({len(STRESS_BUILDERS) - built} unchanged)")
+        return
+    ensure_dirs()
+    built = run_builders(CASE_BUILDERS, "../input", "../output", "",
+                         args.jobs, args.engine, args.cross_check, cache)
+    print(f"Generated {built} test cases in ../input and ../output "
+          f"({len(CASE_BUILDERS) - built} unchanged)")
 
 if __name__ == "__main__":
     main()
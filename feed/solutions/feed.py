@@ -0,0 +1,43 @@
+import sys
+from array import array
+
+# Same algorithm as feed.cpp: every post gets its rank in (likes desc, time
+# desc, user asc) order, posts are replayed by (time asc, likes desc, user
+# asc), and a post appears iff at most k posts seen so far (itself included)
+# rank at or above it -- counted with a Fenwick tree over the ranks.
+# Sort orders are single packed-int keys (u, t < 2^30, l < 2^17). While at
+# most k posts have been seen, every post appears and no query is needed.
+
+data = sys.stdin.buffer.read().split()
+n, k = int(data[0]), int(data[1])
+u = list(map(int, data[2:3 * n + 2:3]))
+t = list(map(int, data[3:3 * n + 3:3]))
+l = list(map(int, data[4:3 * n + 4:3]))
+del data
+
+L, T = (1 << 17) - 1, (1 << 30) - 1  # descending fields are stored as L - l, T - t
+by_rank = sorted(range(n), key=[((L - li) << 60) | ((T - ti) << 30) | ui
+                                for ui, ti, li in zip(u, t, l)].__getitem__)
+rank = array("i", bytes(4 * n))
+for r, i in enumerate(by_rank, 1):
+    rank[i] = r
+by_time = sorted(range(n), key=[(ti << 47) | ((L - li) << 30) | ui
+                                for ui, ti, li in zip(u, t, l)].__getitem__)
+
+fenwick = [0] * (n + 1)
+shown = []
+for seen, i in enumerate(by_time):
+    r = j = rank[i]
+    while j <= n:
+        fenwick[j] += 1
+        j += j & -j
+    if seen < k:
+        shown.append(i + 1)
+        continue
+    better = 0
+    while r:
+        better += fenwick[r]
+        r &= r - 1
+    if better <= k:
+        shown.append(i + 1)
+sys.stdout.write(" ".join(map(str, shown)) + "\n")
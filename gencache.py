@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# gencache.py — content-addressed cache shared by the */gen/gen.py scripts
+#
+# A case is rebuilt only when its key changes. The key hashes:
+#   - the source of the functions every case depends on (reference solver,
+#     writers, helpers) and any constants they read,
+#   - the case builder's source, its seed/parameters and, for scripts that
+#     share one RNG across cases, the RNG state the case starts from.
+# Fresh cases are skipped and their input/output files are left untouched
+# (so their mtimes stay stable). Files edited or deleted by hand are
+# detected by content hash and rebuilt.
+#
+# The manifest lives next to each gen.py as .gencache.json (not committed).
+#
+# Usage from a gen.py (which runs from its own gen/ directory):
+#
+#   cache = GenCache(__file__, deps=[solve, write_case, BIG_C])
+#   key = cache.key(builder, seed, n)
+#   cache.run(case_id, [inp_path, out_path], key, build)
+
+import hashlib
+import inspect
+import json
+import os
+
+MANIFEST = ".gencache.json"
+VERSION = 1
+
+
+def _part_bytes(part) -> bytes:
+    """Functions and classes hash by source, everything else by repr."""
+    if inspect.isfunction(part) or inspect.isclass(part):
+        return inspect.getsource(part).encode()
+    return repr(part).encode()
+
+
+def file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def rng_digest(rng) -> str:
+    """Digest of a random.Random (or the random module) state."""
+    return hashlib.sha256(repr(rng.getstate()).encode()).hexdigest()
+
+
+def dump_state(state):
+    version, internal, gauss_next = state
+    return [version, list(internal), gauss_next]
+
+
+def load_state(obj):
+    version, internal, gauss_next = obj
+    return (version, tuple(internal), gauss_next)
+
+
+class GenCache:
+    def __init__(self, gen_file: str, deps=(), enabled: bool = True):
+        self.dir = os.path.dirname(os.path.abspath(gen_file))
+        self.path = os.path.join(self.dir, MANIFEST)
+        self.enabled = enabled
+        base = hashlib.sha256(f"gencache-v{VERSION}".encode())
+        for part in deps:
+            base.update(_part_bytes(part))
+            base.update(b"\0")
+        self.base = base
+        self.entries = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path) as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}  # unreadable manifest: rebuild everything
+
+    def _rel(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), self.dir)
+
+    def key(self, *parts) -> str:
+        h = self.base.copy()
+        for part in parts:
+            h.update(_part_bytes(part))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def fresh(self, case, key: str, paths) -> bool:
+        if not self.enabled:
+            return False
+        entry = self.entries.get(str(case))
+        if entry is None or entry["key"] != key:
+            return False
+        for path in paths:
+            rel = self._rel(path)
+            if rel not in entry["files"] or not os.path.exists(path):
+                return False
+            if file_digest(path) != entry["files"][rel]:
+                return False
+        return True
+
+    def meta(self, case) -> dict:
+        return self.entries[str(case)].get("meta", {})
+
+    def store(self, case, key: str, paths, **meta):
+        self.entries[str(case)] = {
+            "key": key,
+            "files": {self._rel(p): file_digest(p) for p in paths},
+            "meta": meta,
+        }
+
+    def run(self, case, paths, key: str, build, rng=None):
+        """
+        Call build() unless case is fresh; build writes the files in paths and
+        may return a dict of JSON-able metadata to remember. When rng is given,
+        its state after build() is recorded and restored on a cache hit, so
+        later cases drawing from the same RNG see the same stream.
+        Returns (built, meta).
+        """
+        if self.fresh(case, key, paths):
+            meta = self.meta(case)
+            if rng is not None:
+                rng.setstate(load_state(meta["rng"]))
+            return False, meta
+        meta = build() or {}
+        if rng is not None:
+            meta["rng"] = dump_state(rng.getstate())
+        self.store(case, key, paths, **meta)
+        return True, meta
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.entries, f, sort_keys=True)
+        os.replace(tmp, self.path)
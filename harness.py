@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+# harness.py — local benchmark of the reference solutions against their tests
+#
+# For every task directory with a task.yaml (or the ones given):
+#   - compiles each */solutions/<task>.{c,cpp,java,py} (CMS-like flags),
+#   - runs it on every input/inputK.txt,
+#   - compares with output/outputK.txt (white-diff, or the task's compiled
+#     check/checker when there is one),
+#   - records wall time, CPU time and peak RSS,
+# and reports each test's headroom against the task's time_limit and
+# memory_limit, flagging solutions that come close to them.
+#
+# Usage:
+#   python3 harness.py                      # all tasks, all languages
+#   python3 harness.py bus tree --lang py   # some tasks / languages
+#   python3 harness.py feed --data stress   # run on <task>/stress instead
+#   python3 harness.py --json report.json   # also dump raw measurements
+#
+# Toolchains that are not installed are skipped with a note. Binaries go to
+# build/ (not committed). The helpers here are shared by the other local
+# tools (judge.py, ...).
+
+import argparse
+import json
+import os
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BUILD_DIR = os.path.join(ROOT, "build")
+
+# --------------------- Tasks ---------------------
+
+
+@dataclass
+class Task:
+    name: str
+    dir: str
+    time_limit: float          # seconds
+    memory_limit: int          # MiB
+    n_input: int
+    groups: List[Tuple[float, str]] = field(default_factory=list)  # (points, regex)
+
+    def data_dir(self, data: str = "input") -> str:
+        """Directory holding input/ and output/: the task itself or <task>/stress."""
+        return self.dir if data == "input" else os.path.join(self.dir, data)
+
+    def tests(self, data: str = "input") -> List[int]:
+        """Indices K with both inputK.txt and outputK.txt present, in order."""
+        base = self.data_dir(data)
+        found = []
+        for name in os.listdir(os.path.join(base, "input")):
+            m = re.fullmatch(r"input(\d+)\.txt", name)
+            if m and os.path.exists(self.output_path(int(m.group(1)), data)):
+                found.append(int(m.group(1)))
+        return sorted(found)
+
+    def input_path(self, i: int, data: str = "input") -> str:
+        return os.path.join(self.data_dir(data), "input", f"input{i}.txt")
+
+    def output_path(self, i: int, data: str = "input") -> str:
+        return os.path.join(self.data_dir(data), "output", f"output{i}.txt")
+
+
+def codename(i: int) -> str:
+    """CMS test codename; the Score Parameters regexes match these."""
+    return f"{i:03d}"
+
+
+def read_task_yaml(path: str) -> dict:
+    """Flat `key: value` task.yaml (the only shape CMS task files use here)."""
+    conf = {}
+    with open(path) as f:
+        for line in f:
+            if ":" not in line or line.lstrip().startswith("#"):
+                continue
+            key, value = line.split(":", 1)
+            conf[key.strip()] = value.strip().strip('"')
+    return conf
+
+
+def read_score_groups(info_path: str) -> List[Tuple[float, str]]:
+    """[[points, regex], ...] from the 'Score Parameters' line of info.md."""
+    if not os.path.exists(info_path):
+        return []
+    with open(info_path) as f:
+        m = re.search(r"Score Parameters' to `(.*?)`", f.read())
+    return [(float(p), rx) for p, rx in json.loads(m.group(1))] if m else []
+
+
+def load_task(task_dir: str) -> Task:
+    conf = read_task_yaml(os.path.join(task_dir, "task.yaml"))
+    return Task(
+        name=conf["name"],
+        dir=os.path.abspath(task_dir),
+        time_limit=float(conf["time_limit"]),
+        memory_limit=int(conf["memory_limit"]),
+        n_input=int(conf["n_input"]),
+        groups=read_score_groups(os.path.join(task_dir, "info.md")),
+    )
+
+
+def find_tasks(names: Optional[List[str]] = None) -> List[Task]:
+    if not names:
+        names = sorted(d for d in os.listdir(ROOT)
+                       if os.path.exists(os.path.join(ROOT, d, "task.yaml")))
+    return [load_task(os.path.join(ROOT, name)) for name in names]
+
+
+# --------------------- Solutions ---------------------
+
+# extension -> (language, compile command or None, run command)
+# {src}, {exe}, {dir}, {cls}, {mem} are filled in per solution.
+LANGUAGES = {
+    ".c":    ("c", ["gcc", "-DEVAL", "-std=gnu11", "-O2", "-pipe", "-static", "-s",
+                    "-o", "{exe}", "{src}", "-lm"], ["{exe}"]),
+    ".cpp":  ("cpp", ["g++", "-DEVAL", "-std=gnu++20", "-O2", "-pipe", "-static", "-s",
+                      "-o", "{exe}", "{src}"], ["{exe}"]),
+    ".java": ("java", ["javac", "-d", "{dir}", "{src}"],
+              ["java", "-Deval=true", "-Xmx{mem}M", "-Xss64M", "-cp", "{dir}", "{cls}"]),
+    ".py":   ("py", None, [sys.executable, "{src}"]),
+}
+
+
+class CompileError(Exception):
+    pass
+
+
+@dataclass
+class Solution:
+    task: Task
+    src: str
+    lang: str
+    cmd: List[str] = field(default_factory=list)  # filled in by compile_solution
+
+    @property
+    def label(self) -> str:
+        return f"{self.task.name}/{os.path.basename(self.src)}"
+
+
+def find_solutions(task: Task, langs: Optional[List[str]] = None) -> List[Solution]:
+    sol_dir = os.path.join(task.dir, "solutions")
+    sols = []
+    for name in sorted(os.listdir(sol_dir)):
+        ext = os.path.splitext(name)[1]
+        if ext in LANGUAGES and (not langs or LANGUAGES[ext][0] in langs):
+            sols.append(Solution(task, os.path.join(sol_dir, name), LANGUAGES[ext][0]))
+    return sols
+
+
+def toolchain_missing(sol: Solution) -> Optional[str]:
+    """Name of the first missing compiler/runtime, or None."""
+    _, compile_cmd, run_cmd = LANGUAGES[os.path.splitext(sol.src)[1]]
+    for tool in ([compile_cmd[0]] if compile_cmd else []) + [run_cmd[0]]:
+        if "{" not in tool and shutil.which(tool) is None:
+            return tool
+    return None
+
+
+def compile_solution(sol: Solution) -> List[str]:
+    """Compile (if needed) into build/<task>/ and set sol.cmd; raises CompileError."""
+    ext = os.path.splitext(sol.src)[1]
+    _, compile_cmd, run_cmd = LANGUAGES[ext]
+    stem = os.path.splitext(os.path.basename(sol.src))[0]
+    out_dir = os.path.join(BUILD_DIR, sol.task.name, f"{stem}-{sol.lang}")
+    os.makedirs(out_dir, exist_ok=True)
+    subst = {
+        "src": sol.src,
+        "exe": os.path.join(out_dir, stem),
+        "dir": out_dir,
+        "cls": stem,
+        "mem": str(sol.task.memory_limit),
+    }
+    if compile_cmd:
+        res = subprocess.run([a.format(**subst) for a in compile_cmd],
+                             stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        if res.returncode != 0:
+            raise CompileError(f"{sol.label}: compilation failed\n{res.stdout}")
+    sol.cmd = [a.format(**subst) for a in run_cmd]
+    return sol.cmd
+
+
+# --------------------- Running ---------------------
+
+
+@dataclass
+class RunResult:
+    wall: float        # seconds
+    cpu: float         # user + system seconds
+    rss_kb: int        # peak resident set size
+    returncode: int    # negative: killed by that signal
+    timed_out: bool = False
+
+
+# Linux carries the forking process's peak RSS over exec, so a solution
+# spawned straight from this (large) Python process would report at least
+# our own RSS. The launcher below is forked once, execs into a tiny binary,
+# forks the solution from there and reports its rusage on the given fd.
+LAUNCHER_SRC = r"""
+#include <stdio.h>
+#include <stdlib.h>
+#include <sys/resource.h>
+#include <sys/wait.h>
+#include <unistd.h>
+
+int main(int argc, char **argv) {
+  int fd = atoi(argv[1]);
+  pid_t pid = fork();
+  if (pid == 0) {
+    close(fd);
+    execvp(argv[2], argv + 2);
+    _exit(127);
+  }
+  int status;
+  struct rusage ru;
+  if (pid < 0 || wait4(pid, &status, 0, &ru) < 0) return 126;
+  dprintf(fd, "%d %ld.%06ld %ld.%06ld %ld\n", status,
+          (long)ru.ru_utime.tv_sec, (long)ru.ru_utime.tv_usec,
+          (long)ru.ru_stime.tv_sec, (long)ru.ru_stime.tv_usec, ru.ru_maxrss);
+  return 0;
+}
+"""
+
+_launcher = None
+
+
+def launcher() -> Optional[str]:
+    """Path of the compiled launcher, or None (no gcc): measure directly then."""
+    global _launcher
+    if _launcher is None:
+        exe = os.path.join(BUILD_DIR, "launcher")
+        src = exe + ".c"
+        os.makedirs(BUILD_DIR, exist_ok=True)
+        if not os.path.exists(src) or open(src).read() != LAUNCHER_SRC:
+            with open(src, "w") as f:
+                f.write(LAUNCHER_SRC)
+            if os.path.exists(exe):
+                os.remove(exe)
+        if not os.path.exists(exe) and shutil.which("gcc"):
+            subprocess.run(["gcc", "-O2", "-o", exe, src], stderr=subprocess.DEVNULL)
+        _launcher = exe if os.path.exists(exe) else ""
+    return _launcher or None
+
+
+def run_measured(cmd: List[str], stdin_path: str, stdout_path: str,
+                 timeout: Optional[float] = None,
+                 preexec_fn: Optional[Callable[[], None]] = None,
+                 stderr_path: Optional[str] = None) -> RunResult:
+    """
+    Run cmd with files as stdin/stdout (and stderr, if stderr_path is
+    given; otherwise it is discarded) and collect its rusage. preexec_fn
+    (e.g. setrlimit calls) applies to the solution's process. After timeout
+    seconds of wall time the whole process group is killed.
+    """
+    wrapper = launcher()
+    rfd, wfd = os.pipe() if wrapper else (None, None)
+    argv = [wrapper, str(wfd)] + cmd if wrapper else cmd
+    with open(stdin_path, "rb") as fin, open(stdout_path, "wb") as fout, \
+            open(stderr_path or os.devnull, "wb") as ferr:
+        start = time.perf_counter()
+        try:
+            proc = subprocess.Popen(argv, stdin=fin, stdout=fout, stderr=ferr,
+                                    preexec_fn=preexec_fn, start_new_session=True,
+                                    pass_fds=(wfd,) if wrapper else ())
+        finally:
+            if wrapper:
+                os.close(wfd)
+        timed_out = False
+        while True:
+            pid, status, usage = os.wait4(proc.pid, os.WNOHANG)
+            if pid:
+                break
+            if timeout is not None and time.perf_counter() - start > timeout:
+                os.killpg(proc.pid, signal.SIGKILL)
+                timed_out = True
+                pid, status, usage = os.wait4(proc.pid, 0)
+                break
+            time.sleep(0.002)
+        wall = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    cpu, rss_kb = usage.ru_utime + usage.ru_stime, usage.ru_maxrss
+    if wrapper:
+        with os.fdopen(rfd) as f:
+            report = f.read().split()
+        if report:
+            status, utime, stime, rss = report
+            proc.returncode = os.waitstatus_to_exitcode(int(status))
+            cpu, rss_kb = float(utime) + float(stime), int(rss)
+    return RunResult(wall=wall, cpu=cpu, rss_kb=rss_kb, returncode=proc.returncode,
+                     timed_out=timed_out)
+
+
+# --------------------- Checking ---------------------
+
+
+def checker_command(task: Task) -> Optional[List[str]]:
+    """Compiled <task>/check/checker (built from checker.cpp if needed), or None."""
+    src = os.path.join(task.dir, "check", "checker.cpp")
+    if not os.path.exists(src):
+        return None
+    exe = os.path.join(BUILD_DIR, task.name, "checker")
+    newest = max(os.path.getmtime(src), os.path.getmtime(os.path.join(ROOT, "checklib.h")))
+    if not os.path.exists(exe) or os.path.getmtime(exe) < newest:
+        os.makedirs(os.path.dirname(exe), exist_ok=True)
+        res = subprocess.run(["g++", "-static", "-O3", "-o", exe, src],
+                             stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        if res.returncode != 0:
+            raise CompileError(f"{task.name} checker: compilation failed\n{res.stdout}")
+    return [exe]
+
+
+def white_diff(answer_path: str, output_path: str) -> bool:
+    """CMS white-diff: equal up to whitespace runs and trailing blank lines."""
+    def lines(path):
+        with open(path, "rb") as f:
+            out = [line.split() for line in f]
+        while out and not out[-1]:
+            out.pop()
+        return out
+    return lines(answer_path) == lines(output_path)
+
+
+def check_output(task: Task, checker: Optional[List[str]], input_path: str,
+                 answer_path: str, output_path: str) -> Tuple[bool, str]:
+    if checker is None:
+        ok = white_diff(answer_path, output_path)
+        return ok, "" if ok else "output differs"
+    res = subprocess.run(checker + [input_path, answer_path, output_path],
+                         stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    try:
+        score = float(res.stdout.split()[0])
+    except (IndexError, ValueError):
+        return False, f"checker printed no score: {res.stderr.strip()}"
+    return score >= 1.0, res.stderr.strip()
+
+
+def check_outputs(checker: Optional[List[str]],
+                  triples: List[Tuple[str, str, str]]) -> List[Tuple[bool, str]]:
+    """check_output for many (input, answer, output) triples, one checker process."""
+    if checker is None:
+        return [(ok, "" if ok else "output differs")
+                for ok in (white_diff(ans, out) for _, ans, out in triples)]
+    if not triples:
+        return []
+    res = subprocess.run(checker + ["--batch"], input="".join(f"{i}\n{a}\n{o}\n" for i, a, o in triples),
+                         stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    lines = res.stdout.splitlines()
+    if len(lines) != len(triples):
+        raise RuntimeError(f"checker --batch graded {len(lines)} of {len(triples)} outputs: {res.stderr.strip()}")
+    results = []
+    for line in lines:
+        score, _, message = line.partition(" ")
+        results.append((float(score) >= 1.0, message))
+    return results
+
+
+# --------------------- Benchmark ---------------------
+
+
+def benchmark(sol: Solution, data: str, timeout_factor: float) -> List[dict]:
+    task = sol.task
+    checker = checker_command(task)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        out_path = os.path.join(tmp, "out.txt")
+        for i in task.tests(data):
+            inp, ans = task.input_path(i, data), task.output_path(i, data)
+            res = run_measured(sol.cmd, inp, out_path, timeout=task.time_limit * timeout_factor)
+            if res.timed_out:
+                ok, msg = False, "killed (wall timeout)"
+            elif res.returncode != 0:
+                ok, msg = False, f"exit code {res.returncode}"
+            else:
+                ok, msg = check_output(task, checker, inp, ans, out_path)
+            rows.append({
+                "test": i, "ok": ok, "message": msg,
+                "wall": res.wall, "cpu": res.cpu, "rss_kb": res.rss_kb,
+                "time_frac": res.cpu / task.time_limit,
+                "mem_frac": res.rss_kb / (task.memory_limit * 1024),
+            })
+    return rows
+
+
+def print_report(sol: Solution, rows: List[dict], warn: float, verbose: bool):
+    task = sol.task
+    if not rows:
+        print(f"{sol.label}: no tests")
+        return
+    worst_t = max(rows, key=lambda r: r["time_frac"])
+    worst_m = max(rows, key=lambda r: r["mem_frac"])
+    failed = [r for r in rows if not r["ok"]]
+    flag = "  <-- close to the limits" if max(worst_t["time_frac"], worst_m["mem_frac"]) >= warn else ""
+    print(f"{sol.label}: {len(rows) - len(failed)}/{len(rows)} correct, "
+          f"max cpu {worst_t['cpu']:.3f}s ({worst_t['time_frac']:.0%} of {task.time_limit:g}s, test {worst_t['test']}), "
+          f"max rss {worst_m['rss_kb'] / 1024:.1f}MiB ({worst_m['mem_frac']:.0%} of {task.memory_limit}MiB, "
+          f"test {worst_m['test']}){flag}")
+    for r in rows:
+        if verbose or not r["ok"] or max(r["time_frac"], r["mem_frac"]) >= warn:
+            print(f"    test {r['test']:>3}  wall {r['wall']:.3f}s  cpu {r['cpu']:.3f}s  "
+                  f"rss {r['rss_kb'] / 1024:.1f}MiB  headroom {1 - r['time_frac']:.0%} time, "
+                  f"{1 - r['mem_frac']:.0%} memory  {'OK' if r['ok'] else 'FAIL: ' + r['message']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark reference solutions against task limits.")
+    parser.add_argument("tasks", nargs="*", help="task directories (default: all with a task.yaml)")
+    parser.add_argument("--lang", nargs="+", choices=sorted(l for l, _, _ in LANGUAGES.values()),
+                        help="only these languages")
+    parser.add_argument("--data", default="input",
+                        help="'input' for the contest tests or a subdirectory such as 'stress'")
+    parser.add_argument("--warn", type=float, default=0.5,
+                        help="flag tests using at least this fraction of a limit (default: 0.5)")
+    parser.add_argument("--timeout-factor", type=float, default=5.0,
+                        help="kill runs after this many time limits of wall time (default: 5)")
+    parser.add_argument("--json", metavar="PATH", help="write all measurements as JSON")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every test")
+    args = parser.parse_args()
+
+    report = {}
+    failures = 0
+    for task in find_tasks(args.tasks):
+        for sol in find_solutions(task, args.lang):
+            missing = toolchain_missing(sol)
+            if missing:
+                print(f"{sol.label}: skipped ({missing} not installed)")
+                continue
+            try:
+                compile_solution(sol)
+                rows = benchmark(sol, args.data, args.timeout_factor)
+            except CompileError as e:
+                print(e)
+                failures += 1
+                continue
+            print_report(sol, rows, args.warn, args.verbose)
+            failures += sum(not r["ok"] for r in rows)
+            report[sol.label] = {"time_limit": task.time_limit,
+                                 "memory_limit": task.memory_limit, "tests": rows}
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=1)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
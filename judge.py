@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# judge.py — parallel local judging of the reference solutions, CMS style
+#
+# Every (solution, test) pair is judged in a pool of worker processes (one per
+# core by default). Each run gets the limits of its task.yaml:
+#   - CPU time: RLIMIT_CPU just above time_limit (SIGXCPU/SIGKILL), plus a
+#     wall-clock kill at a few times the limit for runs that sleep or block,
+#   - memory: RLIMIT_AS of memory_limit (not for Java, whose JVM reserves far
+#     more address space than it uses; it gets -Xmx instead), and the peak
+#     RSS is checked against memory_limit afterwards, as a cgroup would.
+# Verdicts: AC, WA, TLE (CPU time over time_limit), MLE (peak RSS over the
+# limit, or an allocation failure under it), RE (any other crash / non-zero
+# exit). Subtask scores follow the GroupMin 'Score Parameters' of info.md.
+# Outputs are graded in batches, one `checker --batch` process (or the
+# built-in white-diff) per CHECK_BATCH outputs.
+#
+# Usage:
+#   python3 judge.py                    # all tasks, all solutions
+#   python3 judge.py tree --lang py -j 8
+#   python3 judge.py bus --verbose      # list every non-AC run
+#
+# Runs share the machine, so timings are noisier than with harness.py;
+# use harness.py / calibrate.py for measurements.
+
+import argparse
+import os
+import re
+import resource
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from harness import (
+    CompileError,
+    checker_command,
+    check_outputs,
+    codename,
+    compile_solution,
+    find_solutions,
+    find_tasks,
+    run_measured,
+    toolchain_missing,
+)
+
+VERDICTS = ("AC", "WA", "TLE", "MLE", "RE")
+WALL_FACTOR = 3  # wall-clock kill after this many time limits (+1 s)
+CHECK_BATCH = 64  # outputs graded per checker process
+MEMORY_ERRORS = (b"MemoryError", b"bad_alloc", b"OutOfMemoryError", b"Cannot allocate memory")
+
+
+def limit_resources(time_limit: float, memory_mib: int):
+    """preexec_fn applying CMS-like limits to the spawned process."""
+    def apply():
+        cpu = int(time_limit) + 1
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+        if memory_mib:
+            size = memory_mib << 20
+            resource.setrlimit(resource.RLIMIT_AS, (size, size))
+        resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    return apply
+
+
+def judge_run(job: dict) -> dict:
+    """
+    Run one (solution, test) pair inside a pool worker. Runs that finish
+    cleanly come back with verdict None and their output left at job["out"]
+    for the batched check in the main process.
+    """
+    task, i, data = job["task"], job["test"], job["data"]
+    memory = 0 if job["lang"] == "java" else task.memory_limit
+    err = job["out"] + ".err"
+    res = run_measured(job["cmd"], task.input_path(i, data), job["out"],
+                       timeout=task.time_limit * WALL_FACTOR + 1,
+                       preexec_fn=limit_resources(task.time_limit, memory),
+                       stderr_path=err)
+    with open(err, "rb") as f:
+        f.seek(max(0, os.path.getsize(err) - 4096))
+        err_tail = f.read()
+    os.remove(err)
+    verdict, message = None, ""
+    if res.timed_out or res.cpu > task.time_limit:
+        verdict = "TLE"
+    elif res.rss_kb > task.memory_limit * 1024:
+        verdict = "MLE"
+    elif res.returncode != 0:
+        oom = any(e in err_tail for e in MEMORY_ERRORS)
+        verdict = "MLE" if oom else "RE"
+        message = f"exit code {res.returncode}"
+    if verdict is not None:
+        os.remove(job["out"])
+    return {"label": job["label"], "test": i, "verdict": verdict, "message": message,
+            "cpu": res.cpu, "wall": res.wall, "rss_kb": res.rss_kb}
+
+
+def grade(jobs: list, runs: list):
+    """Check clean runs with one checker process (see checklib.h --batch) per call."""
+    triples = [(job["task"].input_path(job["test"], job["data"]),
+                job["task"].output_path(job["test"], job["data"]), job["out"]) for job in jobs]
+    for job, r, (ok, message) in zip(jobs, runs, check_outputs(jobs[0]["checker"], triples)):
+        r["verdict"], r["message"] = ("AC" if ok else "WA"), message
+        os.remove(job["out"])
+
+
+def group_scores(task, verdicts: dict) -> list:
+    """GroupMin: a group's points if every test matching its regex is AC."""
+    scores = []
+    for points, regex in task.groups:
+        tests = [i for i in verdicts if re.fullmatch(regex, codename(i))]
+        scores.append(points if tests and all(verdicts[i] == "AC" for i in tests) else 0)
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Judge the reference solutions in parallel with task limits.")
+    parser.add_argument("tasks", nargs="*", help="task directories (default: all with a task.yaml)")
+    parser.add_argument("--lang", nargs="+", choices=["c", "cpp", "java", "py"], help="only these languages")
+    parser.add_argument("--data", default="input",
+                        help="'input' for the contest tests or a subdirectory such as 'stress'")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="parallel runs (default: number of cores)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="list every non-AC run")
+    args = parser.parse_args()
+
+    jobs, solutions = [], []
+    for task in find_tasks(args.tasks):
+        checker = checker_command(task)
+        for sol in find_solutions(task, args.lang):
+            missing = toolchain_missing(sol)
+            if missing:
+                print(f"{sol.label}: skipped ({missing} not installed)")
+                continue
+            try:
+                compile_solution(sol)
+            except CompileError as e:
+                print(e)
+                continue
+            solutions.append(sol)
+            jobs += [{"label": sol.label, "lang": sol.lang, "cmd": sol.cmd, "task": task,
+                      "test": i, "data": args.data, "checker": checker}
+                     for i in task.tests(args.data)]
+
+    results = {sol.label: {} for sol in solutions}
+    pending = {}  # task name -> ([job], [run]) waiting for the checker
+    with tempfile.TemporaryDirectory() as tmp, ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        for n, job in enumerate(jobs):
+            job["out"] = os.path.join(tmp, f"{n}.out")
+        for job, r in zip(jobs, pool.map(judge_run, jobs, chunksize=4)):
+            results[r["label"]][r["test"]] = r
+            if r["verdict"] is None:
+                batch = pending.setdefault(job["task"].name, ([], []))
+                batch[0].append(job)
+                batch[1].append(r)
+                if len(batch[0]) >= CHECK_BATCH:
+                    grade(*pending.pop(job["task"].name))
+        for batch in pending.values():
+            grade(*batch)
+
+    all_ac = True
+    for sol in solutions:
+        runs = results[sol.label]
+        verdicts = {i: r["verdict"] for i, r in runs.items()}
+        counts = " ".join(f"{v} {sum(x == v for x in verdicts.values())}"
+                          for v in VERDICTS if v in verdicts.values())
+        scores = group_scores(sol.task, verdicts)
+        total = f"score {sum(scores):g}/{sum(p for p, _ in sol.task.groups):g}" if scores else ""
+        print(f"{sol.label}: {counts}  {total}  [{' '.join(f'{s:g}' for s in scores)}]")
+        for i, r in sorted(runs.items()):
+            if r["verdict"] != "AC":
+                all_ac = False
+                if args.verbose:
+                    print(f"    test {i:>3}  {r['verdict']:<3}  cpu {r['cpu']:.3f}s  "
+                          f"rss {r['rss_kb'] / 1024:.1f}MiB  {r['message']}")
+    sys.exit(0 if all_ac else 1)
+
+
+if __name__ == "__main__":
+    main()
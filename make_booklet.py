@@ -1,23 +1,49 @@
 #!/usr/bin/env python3
+import argparse
+import hashlib
 import os
+import re
 import subprocess
-from pathlib import Path
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from io import BytesIO
+from pathlib import Path
 import tempfile
 import shutil
 
-from PyPDF2 import PdfReader, PdfWriter, PageObject
+import PyPDF2
+from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2.generic import ArrayObject, DictionaryObject, IndirectObject, NullObject
 from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
 
+LOG_TAIL_LINES = 25  # lines of the pdflatex log shown when a source fails
+MAX_RUNS = 3  # pdflatex passes per source, while the log asks for a rerun
+RERUN_RE = re.compile(rb"Rerun to get|Rerun LaTeX|Label\(s\) may have changed")
+
+# Compiled PDFs by content hash (of the processed .tex, everything it
+# includes and the pdflatex version); unchanged sources are not recompiled.
+# A hit refreshes the entry's mtime, so --clean-cache can tell how long ago
+# any build (of any variant sharing the cache) last used it.
+CACHE_DIR = Path(".booklet-cache")
+CACHE_MAX_AGE_DAYS = 30  # default for --clean-cache
+INCLUDE_RE = re.compile(r"\\(includegraphics|input|include)\s*(?:\[[^\]]*\])?\s*\{([^}]+)\}")
+INCLUDE_EXTS = {"includegraphics": ["", ".pdf", ".png", ".jpg"], "input": ["", ".tex"], "include": [".tex"]}
+
+# Page numbers are stamped from one cached multi-page overlay per page size.
+OVERLAY_FONT = ("Times-Roman", 11)
+OVERLAY_Y = 20  # baseline of the centred page number
+OVERLAY_BLOCK = 100  # overlays are rendered in multiples of this many pages
 
-def strip_booklet_conditionals(tex_file: Path) -> Path:
+
+def strip_booklet_conditionals(tex_file: Path, out_dir: Path) -> Path:
     r"""
-    Copy .tex file into same dir with _booklet.tex suffix,
+    Copy .tex file into out_dir with _booklet.tex suffix,
     stripping only the lines \ifdefined\BOOKLET and \fi.
     Keeps content inside untouched.
     """
-    new_path = tex_file.with_name(tex_file.stem + "_booklet.tex")
+    new_path = out_dir / (tex_file.stem + "_booklet.tex")
     with open(tex_file, "r") as f_in, open(new_path, "w") as f_out:
         for line in f_in:
             if line.strip().startswith(r"\ifdefined\BOOKLET"):
@@ -28,31 +54,247 @@ def strip_booklet_conditionals(tex_file: Path) -> Path:
     return new_path
 
 
-def run_pdflatex(tex_file: Path):
-    """Run pdflatex on a given .tex file."""
-    subprocess.run(
-        ["pdflatex", "-interaction=nonstopmode", "-halt-on-error", tex_file.name],
-        cwd=tex_file.parent,
-        check=True,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-    )
-
-
-def create_page_number_overlay(page_num, width=float(A4[0]), height=float(A4[1])):
-    """Generate a single-page PDF overlay with optional page number."""
-    packet = BytesIO()
-    c = canvas.Canvas(packet, pagesize=(width, height))
-    if page_num is not None:
-        c.setFont("Times-Roman", 11)
-        c.drawCentredString(width / 2.0, 20, str(page_num))
-    c.showPage()
+def run_pdflatex(tex_file: Path, source: Path):
+    """
+    Run pdflatex on tex_file (the processed copy of source) from source's
+    directory, so relative includes resolve as usual, with every output
+    written next to tex_file. Reruns only while the log asks for it; on
+    failure, raise naming source, with the log tail.
+    """
+    log = tex_file.with_suffix(".log")
+    for _ in range(MAX_RUNS):
+        result = subprocess.run(
+            ["pdflatex", "-interaction=nonstopmode", "-halt-on-error",
+             f"-output-directory={tex_file.parent}", str(tex_file)],
+            cwd=source.parent,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+        if result.returncode != 0:
+            text = log.read_text(errors="replace") if log.exists() else result.stdout.decode(errors="replace")
+            tail = "\n".join(text.splitlines()[-LOG_TAIL_LINES:])
+            raise RuntimeError(f"pdflatex failed on {source} (exit code {result.returncode}):\n{tail}")
+        if not (log.exists() and RERUN_RE.search(log.read_bytes())):
+            return
+
+
+@lru_cache(maxsize=None)
+def pdflatex_version() -> str:
+    try:
+        out = subprocess.run(["pdflatex", "--version"], stdout=subprocess.PIPE, text=True).stdout
+    except OSError:
+        return "missing"
+    return out.splitlines()[0] if out else "unknown"
+
+
+def source_key(tex_file: Path, base_dir: Path) -> str:
+    """
+    Hash of tex_file, the files it includes (recursively, resolved against
+    base_dir) and the pdflatex version.
+    """
+    h = hashlib.sha256(pdflatex_version().encode())
+    h.update(tex_file.read_bytes())
+    pending, seen = [tex_file], set()
+    while pending:
+        text = re.sub(r"(?<!\\)%.*", "", pending.pop().read_text(errors="replace"))
+        for kind, name in INCLUDE_RE.findall(text):
+            path = next((base_dir / (name + ext) for ext in INCLUDE_EXTS[kind]
+                         if (base_dir / (name + ext)).is_file()), None)
+            h.update(f"\0{kind}\0{name}\0".encode())
+            if path is None:
+                h.update(b"missing")
+            elif path not in seen:
+                seen.add(path)
+                h.update(path.read_bytes())
+                if path.suffix == ".tex":
+                    pending.append(path)
+    return h.hexdigest()
+
+
+def build_pdf(tex: Path, work_dir: Path, force: bool = False) -> Path:
+    """
+    .tex → work_dir/*_booklet.tex → .pdf, reusing the cached PDF when the
+    sources are unchanged
+    """
+    work_dir.mkdir()
+    processed = strip_booklet_conditionals(tex, work_dir)
+    cached = CACHE_DIR / f"{source_key(processed, tex.parent)}.pdf"
+    if not force:
+        try:
+            os.utime(cached)  # last use, see --clean-cache
+        except FileNotFoundError:
+            pass
+        else:
+            print(f"{tex}: unchanged, using cached PDF")
+            return cached
+    run_pdflatex(processed, tex)
+    pdf_file = processed.with_suffix(".pdf")
+    if not pdf_file.exists():
+        raise RuntimeError(f"Expected PDF not found: {pdf_file}")
+    CACHE_DIR.mkdir(exist_ok=True)
+    tmp = cached.with_name(f"{cached.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    shutil.copyfile(pdf_file, tmp)
+    os.replace(tmp, cached)
+    print(f"{tex}: compiled")
+    return cached
+
+
+def build_all(sources, work_root: Path, jobs: int, force: bool = False):
+    """
+    Compile all sources, each in its own directory under work_root, in a pool
+    of at most jobs pdflatex runs; PDFs in source order.
+    """
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(build_pdf, tex, work_root / str(i), force)
+                   for i, tex in enumerate(sources)]
+    errors = [str(f.exception()) for f in futures if f.exception() is not None]
+    if errors:
+        raise RuntimeError("\n\n".join(errors))
+    return [f.result() for f in futures]
+
+
+def page_number_overlay(width: float, height: float, count: int) -> PdfReader:
+    """
+    Overlay PDF for one page size whose page k - 1 shows page number k, for at
+    least k = 1..count. Rendered once (rounded up to OVERLAY_BLOCK pages) and
+    kept in CACHE_DIR, so later builds and booklet variants reuse it.
+    """
+    key = hashlib.sha256(repr((width, height, OVERLAY_FONT, OVERLAY_Y)).encode()).hexdigest()[:16]
+    path = CACHE_DIR / f"overlay-{key}.pdf"
+    if path.exists():
+        reader = PdfReader(str(path))
+        if len(reader.pages) >= count:
+            return reader
+    CACHE_DIR.mkdir(exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    c = canvas.Canvas(str(tmp), pagesize=(width, height))
+    for number in range(1, -(-count // OVERLAY_BLOCK) * OVERLAY_BLOCK + 1):
+        c.setFont(*OVERLAY_FONT)
+        c.drawCentredString(width / 2.0, OVERLAY_Y, str(number))
+        c.showPage()
     c.save()
-    packet.seek(0)
-    return PdfReader(packet).pages[0]
+    os.replace(tmp, path)
+    return PdfReader(str(path))
+
+
+def clean_cache(max_age_days: int, started: float):
+    """
+    Delete the compiled-source PDFs no build has used for max_age_days (nor
+    the build that started at started). Overlays (a few, one per page size)
+    and temporary files stay.
+    """
+    cutoff = min(started, time.time() - max_age_days * 86400)
+    removed = kept = 0
+    for path in CACHE_DIR.glob("*.pdf"):
+        if path.name.startswith("overlay-"):
+            continue
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+            else:
+                kept += 1
+        except FileNotFoundError:
+            pass
+    print(f"{CACHE_DIR}: removed {removed} compiled PDF(s) unused for {max_age_days} days, kept {kept}")
+
+
+# dedup_objects rewrites PdfWriter._objects, which is private to PyPDF2 (and
+# PyPDF2 has no public API for it), so it only runs on the releases it was
+# checked against (pinned in requirements.txt); other versions write the
+# booklet without it.
+DEDUP_PYPDF2_VERSIONS = ("3.0.",)
+
+
+def dedup_objects(writer: PdfWriter) -> int:
+    """
+    Keep one copy of identical objects across the merged PDFs. Every indirect
+    object is serialized; references to later identical copies are pointed at
+    the first one and the copies are written as null. Repeats until nothing
+    changes: once the font programs and images are shared, the descriptors
+    and font dictionaries referring to them become identical too. Pages and
+    the page tree are never merged. Returns the number of objects dropped.
+    Works on PdfWriter._objects, private PyPDF2 API: only call it on the
+    versions in DEDUP_PYPDF2_VERSIONS.
+    """
+    objects = writer._objects
+    dropped = 0
+    while True:
+        first, dup = {}, {}
+        for idnum, obj in enumerate(objects, 1):
+            if isinstance(obj, NullObject) or (isinstance(obj, DictionaryObject)
+                                               and obj.get("/Type") in ("/Page", "/Pages", "/Catalog")):
+                continue
+            buf = BytesIO()
+            obj.write_to_stream(buf, None)
+            dup_of = first.setdefault(buf.getvalue(), idnum)
+            if dup_of != idnum:
+                dup[idnum] = IndirectObject(dup_of, 0, writer)
+        if not dup:
+            return dropped
+        for obj in objects:
+            stack = [obj]
+            while stack:
+                container = stack.pop()
+                if isinstance(container, DictionaryObject):
+                    items = list(container.items())
+                elif isinstance(container, ArrayObject):
+                    items = list(enumerate(container))
+                else:
+                    continue
+                for key, value in items:
+                    if isinstance(value, IndirectObject):
+                        if value.pdf is writer and value.idnum in dup:
+                            container[key] = dup[value.idnum]
+                    else:
+                        stack.append(value)
+        for idnum in dup:
+            objects[idnum - 1] = NullObject()
+        dropped += len(dup)
+
+
+def merge(generated_pdfs, output: str = "booklet.pdf"):
+    """Merge the PDFs into output and stamp page numbers onto the pages."""
+    writer = PdfWriter()
+    pages = [page for pdf_path in generated_pdfs for page in PdfReader(str(pdf_path)).pages]
+    overlays = {}  # (width, height) -> overlay PDF
+
+    for page_number, page in enumerate(pages, 1):
+        size = (float(page.mediabox.width), float(page.mediabox.height))
+        if size not in overlays:
+            overlays[size] = page_number_overlay(*size, len(pages))
+        page.merge_page(overlays[size].pages[page_number - 1])
+        page.compress_content_streams()
+        writer.add_page(page)
+    if PyPDF2.__version__.startswith(DEDUP_PYPDF2_VERSIONS):
+        dedup_objects(writer)
+    else:
+        print(f"PyPDF2 {PyPDF2.__version__} is not among {DEDUP_PYPDF2_VERSIONS}: "
+              "identical objects are not shared")
+
+    tmp = f"{output}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f_out:
+        writer.write(f_out)
+    os.replace(tmp, output)
+
+    print(f"{output} built successfully")
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Build booklet.pdf from the intro, sample and statements.")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="concurrent pdflatex runs (default: number of cores)")
+    parser.add_argument("--force", action="store_true",
+                        help=f"recompile every source, ignoring {CACHE_DIR}/")
+    parser.add_argument("-o", "--output", default="booklet.pdf", help="output PDF (default: booklet.pdf)")
+    parser.add_argument("--build-root", help="where per-build scratch directories are created "
+                        "(default: the system temp dir; e.g. /dev/shm for tmpfs)")
+    parser.add_argument("--clean-cache", type=int, nargs="?", const=CACHE_MAX_AGE_DAYS, metavar="DAYS",
+                        help=f"after a successful build, delete the compiled PDFs in {CACHE_DIR}/ "
+                        f"no build has used for DAYS days (default: {CACHE_MAX_AGE_DAYS})")
+    parser.add_argument("--keep-build", action="store_true", help="keep the scratch directory (for debugging)")
+    args = parser.parse_args()
+
     sources = [
         # Path("cover.tex"),
         Path("intro.tex"),
@@ -62,55 +304,18 @@ def main():
         Path("feed/statement/statement.tex"),
     ]
 
-    generated_pdfs = []
-    temp_tex_files = []
-
-    # Process each .tex → *_booklet.tex → .pdf
-    for tex in sources:
-        processed = strip_booklet_conditionals(tex)
-        temp_tex_files.append(processed)
-
-        run_pdflatex(processed)
-        pdf_file = processed.with_suffix(".pdf")
-        if not pdf_file.exists():
-            raise RuntimeError(f"Expected PDF not found: {pdf_file}")
-        generated_pdfs.append(pdf_file)
-
-    # Merge and overlay page numbers
-    writer = PdfWriter()
-    page_counter = 0
-
-    for i, pdf_path in enumerate(generated_pdfs):
-        reader = PdfReader(str(pdf_path))
-        for page in reader.pages:
-            width = float(page.mediabox.width)
-            height = float(page.mediabox.height)
-
-            # if i == 0:  # cover, no page number
-                # overlay = create_page_number_overlay(None, width, height)
-            # else:
-            page_counter += 1
-            overlay = create_page_number_overlay(page_counter, width, height)
-
-            # Merge overlay
-            new_page = PageObject.create_blank_page(width=width, height=height)
-            new_page.merge_page(page)
-            new_page.merge_page(overlay)
-            writer.add_page(new_page)
-
-    with open("booklet.pdf", "wb") as f_out:
-        writer.write(f_out)
-
-    print("booklet.pdf built successfully")
-
-    # Cleanup intermediate files
-    for f in temp_tex_files:
-        base = f.with_suffix("")
-        for ext in [".tex", ".aux", ".log", ".out", ".pdf"]:
-            try:
-                os.remove(str(base) + ext)
-            except FileNotFoundError:
-                pass
+    # Sources are never written to: every build gets its own scratch directory
+    started = time.time()
+    work_root = Path(tempfile.mkdtemp(prefix="booklet-", dir=args.build_root)).resolve()
+    try:
+        merge(build_all(sources, work_root, args.jobs, args.force), args.output)
+        if args.clean_cache is not None:
+            clean_cache(args.clean_cache, started)
+    finally:
+        if args.keep_build:
+            print(f"build files kept in {work_root}")
+        else:
+            shutil.rmtree(work_root, ignore_errors=True)
 
 
 if __name__ == "__main__":
@@ -1,6 +1,24 @@
 #!/usr/bin/env python3
+# Unchanged cases are skipped via ../../gencache.py (--force rebuilds all).
+#
+# Stress tier (--stress, needs numpy): N up to 1e7 and coordinates up to
+# 1e18, far beyond the statement, into ../stress. Each case is a numpy array
+# of sorted unique positions drawn from its own seed, so cases build
+# independently (in parallel with -j); the answer is np.diff(x).min().
+import argparse
 import os
 import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+import genio
+from gencache import GenCache, rng_digest
+
+try:
+    import numpy as np
+except ImportError:  # only the --stress tier needs numpy
+    np = None
 
 N_MAX = 1000
 X_MAX = 10**6
@@ -8,6 +26,8 @@ X_MAX = 10**6
 # Directory structure (relative to gen/)
 INPUT_DIR = "../input"
 OUTPUT_DIR = "../output"
+STRESS_INPUT_DIR = "../stress/input"
+STRESS_OUTPUT_DIR = "../stress/output"
 
 def ensure_dirs():
     os.makedirs(INPUT_DIR, exist_ok=True)
@@ -18,17 +38,33 @@ def write_case(idx, n, positions):
     out_path = os.path.join(OUTPUT_DIR, f"output{idx}.txt")
 
     # Write input
-    with open(in_path, "w") as f:
+    with genio.atomic_open(in_path) as f:
         f.write(f"{n}\n")
-        f.write(" ".join(map(str, positions)) + "\n")
+        genio.write_ints(f, positions)
 
     # Write output
-    diffs = [positions[i+1] - positions[i] for i in range(n-1)]
-    with open(out_path, "w") as f:
-        f.write(str(min(diffs)) + "\n")
+    gap = min(b - a for a, b in zip(positions, positions[1:]))
+    genio.write_text(out_path, str(gap) + "\n")
+
+def small_case():
+    n = random.randint(2, 100)
+    return n, sorted(random.sample(range(0, 1001), n))
+
+def large_case():
+    n = random.randint(500, 1000)  # big stress test
+    return n, sorted(random.sample(range(0, X_MAX+1), n))
 
-def gen_cases():
+def cached_case(cache, idx, make, *params):
+    """Write case idx from make() unless cached; make draws from the global random."""
+    paths = [os.path.join(INPUT_DIR, f"input{idx}.txt"),
+             os.path.join(OUTPUT_DIR, f"output{idx}.txt")]
+    key = cache.key(make, rng_digest(random), *params)
+    cache.run(idx, paths, key, lambda: write_case(idx, *make()), rng=random)
+
+def gen_cases(force=False):
     ensure_dirs()
+    cache = GenCache(__file__, deps=[write_case, genio.write_ints, N_MAX, X_MAX],
+                     enabled=not force)
     idx = 0
 
     # Group 1: 2 sample cases
@@ -37,23 +73,106 @@ def gen_cases():
         (4, [10, 20, 25, 40]),
     ]
     for n, pos in samples:
-        write_case(idx, n, pos)
+        cached_case(cache, idx, lambda: (n, pos), n, pos)
         idx += 1
 
     # Group 2: 5 small random cases (N ≤ 100, X ≤ 1000)
     for _ in range(5):
-        n = random.randint(2, 100)
-        positions = sorted(random.sample(range(0, 1001), n))
-        write_case(idx, n, positions)
+        cached_case(cache, idx, small_case)
         idx += 1
 
     # Group 3: 5 larger random cases (N ≤ 1000, X ≤ 10^6)
     for _ in range(5):
-        n = random.randint(500, 1000)  # big stress test
-        positions = sorted(random.sample(range(0, X_MAX+1), n))
-        write_case(idx, n, positions)
+        cached_case(cache, idx, large_case)
         idx += 1
 
+    cache.save()
+    genio.sync_dirs()
+
+# --------------------- Stress tier (--stress) ---------------------
+
+STRESS_X_MAX = 10**18
+WRITE_CHUNK = 1 << 16  # positions formatted per write
+
+def sorted_unique_np(n, hi, gen):
+    """n distinct positions in [0, hi], sorted, uniform over such sets."""
+    # Floyd's sampling for sparse ranges, a partial permutation for dense ones
+    return np.sort(gen.choice(hi + 1, size=n, replace=False))
+
+def write_stress_case(idx, x):
+    with genio.atomic_open(os.path.join(STRESS_INPUT_DIR, f"input{idx}.txt")) as f:
+        f.write(f"{len(x)}\n")
+        for lo in range(0, len(x), WRITE_CHUNK):
+            end = "\n" if lo + WRITE_CHUNK >= len(x) else " "
+            genio.write_ints(f, x[lo:lo + WRITE_CHUNK].tolist(), end=end)
+    gap = int(np.diff(x).min())
+    genio.write_text(os.path.join(STRESS_OUTPUT_DIR, f"output{idx}.txt"), f"{gap}\n")
+
+def stress_uniform_1e6(idx):
+    write_stress_case(idx, sorted_unique_np(10**6, STRESS_X_MAX, np.random.default_rng(7001)))
+
+def stress_uniform_1e7(idx):
+    write_stress_case(idx, sorted_unique_np(10**7, STRESS_X_MAX, np.random.default_rng(7002)))
+
+def stress_dense_1e7(idx):
+    # small coordinates, many gaps of 1
+    n = 10**7
+    write_stress_case(idx, sorted_unique_np(n, 3 * n // 2, np.random.default_rng(7003)))
+
+def stress_late_pair_1e7(idx):
+    # jittered lattice, gaps >= 5e10, and one close pair at the very end
+    gen = np.random.default_rng(7004)
+    n, step = 10**7, 10**11
+    x = np.arange(n, dtype=np.int64) * step + gen.integers(0, step // 2, size=n, dtype=np.int64)
+    x[-1] = x[-2] + int(gen.integers(1, 1000))
+    write_stress_case(idx, x)
+
+STRESS_BUILDERS = [
+    stress_uniform_1e6,
+    stress_uniform_1e7,
+    stress_dense_1e7,
+    stress_late_pair_1e7,
+]
+
+def gen_stress(jobs, force=False):
+    if np is None:
+        raise SystemExit("--stress needs numpy installed")
+    os.makedirs(STRESS_INPUT_DIR, exist_ok=True)
+    os.makedirs(STRESS_OUTPUT_DIR, exist_ok=True)
+    cache = GenCache(__file__, deps=[sorted_unique_np, write_stress_case, STRESS_X_MAX,
+                                     WRITE_CHUNK, genio.write_ints], enabled=not force)
+    pending = []
+    for idx, builder in enumerate(STRESS_BUILDERS):
+        paths = [os.path.join(STRESS_INPUT_DIR, f"input{idx}.txt"),
+                 os.path.join(STRESS_OUTPUT_DIR, f"output{idx}.txt")]
+        key = cache.key(builder)
+        if not cache.fresh(f"stress/{idx}", key, paths):
+            pending.append((idx, builder, key, paths))
+    # every builder seeds its own generator and writes only its own files
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(builder, idx) for idx, builder, _, _ in pending]
+        for (idx, _, key, paths), f in zip(pending, futures):
+            f.result()
+            cache.store(f"stress/{idx}", key, paths)
+    cache.save()
+    genio.sync_dirs(STRESS_INPUT_DIR, STRESS_OUTPUT_DIR)
+    print(f"Generated {len(pending)} stress cases in ../stress "
+          f"({len(STRESS_BUILDERS) - len(pending)} unchanged)")
+
 if __name__ == "__main__":
-    random.seed(42)
-    gen_cases()
+    parser = argparse.ArgumentParser(description="Generate Neighbours tests.")
+    parser.add_argument("--stress", action="store_true",
+                        help="build the N <= 1e7, x <= 1e18 tier into ../stress (needs numpy)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="worker processes for --stress (default: 1)")
+    parser.add_argument("--force", action="store_true",
+                        help="rebuild every case, ignoring the generation cache")
+    parser.add_argument("--fsync", action="store_true",
+                        help="fsync written files and (once per run) their directories")
+    args = parser.parse_args()
+    genio.configure(args.fsync)
+    if args.stress:
+        gen_stress(args.jobs, args.force)
+    else:
+        random.seed(42)
+        gen_cases(args.force)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# pack.py — stream the contest into one compressed archive in CMS's import layout
+#
+# The archive holds what the CMS italy_yaml importer reads, under the same
+# paths as in this repository:
+#   contest.yaml, plus setup.sh and checklib.h to build the checkers,
+#   <task>/task.yaml, <task>/statement/, <task>/check/ (when present),
+#   <task>/input/inputK.txt and <task>/output/outputK.txt
+# for the tasks listed in contest.yaml (or the ones given).
+# - Before anything is written, input/ and output/ of every task must hold
+#   exactly K = 0 .. n_input-1 of its task.yaml.
+# - Identical files are stored once: later copies become tar hard links to
+#   the first one (extracted as links, which CMS reads like any file).
+# - Every task is one tar segment, written member by member straight into a
+#   gzip (or xz) compressor by a worker process, spooled to a temporary file
+#   in chunks, so memory does not grow with the data. The segments are
+#   copied to the archive in task order as they complete, as concatenated
+#   gzip members (or xz streams), which tar, gzip/xz and Python's tarfile
+#   read as a single archive.
+#
+# Usage:
+#   python3 pack.py                                   # contest.tar.gz
+#   python3 pack.py --xz -o codeferno.tar.xz
+#   python3 pack.py -o - | ssh judge 'tar xzf - -C contest'
+#   python3 pack.py tree expo -o backup.tar.gz
+
+import argparse
+import gzip
+import lzma
+import os
+import re
+import shutil
+import sys
+import tarfile
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from gencache import file_digest
+from harness import ROOT, find_tasks
+
+ROOT_FILES = ["contest.yaml", "setup.sh", "checklib.h"]
+TASK_DIRS = ["statement", "check"]  # copied whole when present
+
+
+def contest_tasks(path: str) -> list:
+    """Task names listed under `tasks:` in contest.yaml."""
+    names, in_tasks = [], False
+    with open(path) as f:
+        for line in f:
+            if re.match(r"\S", line):
+                in_tasks = line.startswith("tasks:")
+            elif in_tasks and line.strip().startswith("- "):
+                names.append(line.strip()[2:].strip().strip('"'))
+    return names
+
+
+def test_file_problems(task) -> list:
+    """Mismatches between n_input and the inputK/outputK files present."""
+    problems = []
+    expected = set(range(task.n_input))
+    for kind in ("input", "output"):
+        kind_dir = os.path.join(task.dir, kind)
+        found = set()
+        for name in os.listdir(kind_dir) if os.path.isdir(kind_dir) else ():
+            m = re.fullmatch(kind + r"(\d+)\.txt", name)
+            if m:
+                found.add(int(m.group(1)))
+        for label, ids in (("missing", expected - found), ("unexpected", found - expected)):
+            if ids:
+                listed = ", ".join(f"{kind}{i}.txt" for i in sorted(ids)[:5])
+                more = f" and {len(ids) - 5} more" if len(ids) > 5 else ""
+                problems.append(f"{task.name}: n_input is {task.n_input}, "
+                                f"{label} {listed}{more}")
+    return problems
+
+
+def task_files(task) -> list:
+    """Archive paths of a task's files (relative to ROOT), in archive order."""
+    rel = os.path.relpath(task.dir, ROOT)
+    files = [f"{rel}/task.yaml"]
+    for sub in TASK_DIRS:
+        for dirpath, dirnames, filenames in os.walk(os.path.join(task.dir, sub)):
+            dirnames.sort()
+            base = os.path.relpath(dirpath, ROOT)
+            files += [f"{base}/{name}" for name in sorted(filenames)]
+    files += [f"{rel}/input/input{i}.txt" for i in range(task.n_input)]
+    files += [f"{rel}/output/output{i}.txt" for i in range(task.n_input)]
+    return files
+
+
+def plan_links(segments: list) -> list:
+    """[(path, first path with the same content or None)] per segment."""
+    first = {}
+    plans = []
+    for files in segments:
+        entries = []
+        for path in files:
+            target = first.setdefault(file_digest(os.path.join(ROOT, path)), path)
+            entries.append((path, None if target == path else target))
+        plans.append(entries)
+    return plans
+
+
+COPY_CHUNK = 1 << 20
+
+
+def compressor(path: str, xz: bool, level: int):
+    if xz:
+        return lzma.LZMAFile(path, "wb", preset=level)
+    return gzip.GzipFile(path, "wb", compresslevel=level, mtime=0)
+
+
+def build_segment(entries: list, xz: bool, level: int, path: str) -> int:
+    """
+    Write the tar members of entries (no end-of-archive marker) through the
+    compressor into path; returns the uncompressed size.
+    """
+    raw = 0
+    with compressor(path, xz, level) as out:
+        for name, target in entries:
+            full = os.path.join(ROOT, name)
+            st = os.stat(full)
+            info = tarfile.TarInfo(name)
+            info.mode = st.st_mode & 0o777
+            info.mtime = int(st.st_mtime)
+            if target is not None:
+                info.type = tarfile.LNKTYPE
+                info.linkname = target
+            else:
+                info.size = st.st_size
+            header = info.tobuf(tarfile.PAX_FORMAT)
+            out.write(header)
+            raw += len(header)
+            if target is None:
+                with open(full, "rb") as f:
+                    shutil.copyfileobj(f, out, COPY_CHUNK)
+                pad = -st.st_size % tarfile.BLOCKSIZE
+                out.write(bytes(pad))
+                raw += st.st_size + pad
+    return raw
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack the contest into a CMS import archive.")
+    parser.add_argument("tasks", nargs="*", help="task directories (default: the tasks of contest.yaml)")
+    parser.add_argument("-o", "--output", help="archive path, or - for stdout "
+                        "(default: contest.tar.gz, contest.tar.xz with --xz)")
+    parser.add_argument("--xz", action="store_true", help="xz instead of gzip (smaller, slower)")
+    parser.add_argument("--level", type=int, help="compression level (default: 9 for gzip, 6 for xz)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="tasks compressed in parallel (default: number of cores)")
+    args = parser.parse_args()
+    level = args.level if args.level is not None else (6 if args.xz else 9)
+    output = args.output or ("contest.tar.xz" if args.xz else "contest.tar.gz")
+
+    tasks = find_tasks(args.tasks or contest_tasks(os.path.join(ROOT, "contest.yaml")))
+    problems = [p for task in tasks for p in test_file_problems(task)]
+    if problems:
+        print("\n".join(problems), file=sys.stderr)
+        sys.exit("test files do not match n_input, nothing written")
+
+    segments = [[name for name in ROOT_FILES if os.path.exists(os.path.join(ROOT, name))]]
+    segments += [task_files(task) for task in tasks]
+    plans = plan_links(segments)
+    stored = sum(target is None for entries in plans for _, target in entries)
+    total = sum(map(len, plans))
+
+    tmp = None
+    if output == "-":
+        out = sys.stdout.buffer
+    else:
+        tmp = f"{output}.{os.getpid()}.tmp"
+        out = open(tmp, "wb")
+    spool = tempfile.mkdtemp(prefix="pack-")
+    parts = [os.path.join(spool, f"{i}.part") for i in range(len(plans) + 1)]
+    raw_size = packed_size = 0
+    try:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            raws = pool.map(build_segment, plans, repeat(args.xz), repeat(level), parts)
+            for part, raw in zip(parts, raws):
+                with open(part, "rb") as f:
+                    shutil.copyfileobj(f, out, COPY_CHUNK)
+                packed_size += os.path.getsize(part)
+                raw_size += raw
+                os.remove(part)
+        with compressor(parts[-1], args.xz, level) as end:
+            end.write(bytes(2 * tarfile.BLOCKSIZE))
+        with open(parts[-1], "rb") as f:
+            shutil.copyfileobj(f, out, COPY_CHUNK)
+        packed_size += os.path.getsize(parts[-1])
+        out.flush()
+        if tmp:
+            out.close()
+            os.replace(tmp, output)
+    except BaseException:
+        if tmp:
+            out.close()
+            os.remove(tmp)
+        raise
+    finally:
+        shutil.rmtree(spool, ignore_errors=True)
+    print(f"{output}: {len(tasks)} tasks, {total} files ({total - stored} stored as links), "
+          f"{raw_size / 2**20:.1f} MiB tar -> {packed_size / 2**20:.1f} MiB", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
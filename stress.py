@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+# stress.py — parallel differential testing of the reference implementations
+#
+# Random small inputs are generated in a pool of worker processes, BATCH per
+# pool task; every solution in <task>/solutions is run on each one and
+# compared with the generator's own reference:
+#   bus:  solve() of bus/gen/gen.py             vs bus/solutions/bus.*
+#   feed: solve_reference() of feed/gen/gen.py  vs feed/solutions/feed.*
+#   tree: traversals_from_edges() of tree/gen   vs tree/solutions/tree.*
+# A batch is written to files and each solution runs all of it from one
+# worker: Python solutions are compiled once and each case runs in a forked
+# child (no interpreter startup), binaries are started with posix_spawn.
+# Case i of a run is drawn from random.Random(seed + i), so any failure can
+# be replayed with --seed. On the first mismatch the input is shrunk
+# (greedily: drop elements, lower values, while the mismatch persists) and
+# the minimal counterexample is printed and saved in build/stress/.
+#
+# Usage:
+#   python3 stress.py bus                 # until a mismatch or Ctrl-C
+#   python3 stress.py tree -n 20000 -j 8  # a fixed number of cases
+#   python3 stress.py feed --lang cpp --max-n 30
+
+import argparse
+import importlib.util
+import os
+import random
+import signal
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from harness import (
+    BUILD_DIR,
+    ROOT,
+    CompileError,
+    compile_solution,
+    find_solutions,
+    find_tasks,
+    toolchain_missing,
+)
+
+BATCH = 200  # cases per pool task, run by one process per implementation
+CASE_TIMEOUT = 10  # seconds per run
+
+_gens = {}
+
+
+def load_gen(task: str):
+    """<task>/gen/gen.py as a module (without running its main)."""
+    if task not in _gens:
+        path = os.path.join(ROOT, task, "gen", "gen.py")
+        spec = importlib.util.spec_from_file_location(f"{task}_gen", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _gens[task] = module
+    return _gens[task]
+
+
+# --------------------- bus ---------------------
+# case: (on, off, C, spacing), always valid (off never exceeds the occupancy);
+# a nonzero spacing seeds irregular whitespace between the tokens (runs of
+# spaces, tabs, blank lines, trailing blanks), 0 is the canonical layout
+
+BUS_GAPS = [" ", "  ", "\t", "\n", " \n", "\r\n", "\n\n"]
+
+
+def bus_random(rng, max_n):
+    n = rng.randint(1, max_n)
+    maxv = rng.choice([3, 10, 10**4])
+    C = rng.choice([1, rng.randint(1, 3 * maxv), 10**9])
+    on = [rng.randint(0, maxv) for _ in range(n)]
+    off = [rng.randint(0, maxv) for _ in range(n)]
+    spacing = rng.choice([0, rng.randint(1, 10**9)])
+    return load_gen("bus").normalize_nonnegative(on, off, C) + (C, spacing)
+
+
+def bus_input(case):
+    on, off, C, spacing = case
+    if not spacing:
+        return f"{len(on)}\n{' '.join(map(str, on))}\n{' '.join(map(str, off))}\n{C}\n"
+    rng = random.Random(spacing)
+    tokens = [len(on), *on, *off, C]
+    return rng.choice(["", " ", "\n"]) + "".join(f"{t}{rng.choice(BUS_GAPS)}" for t in tokens)
+
+
+def bus_answer(case):
+    on, off, C, _ = case
+    return load_gen("bus").solve(on, off, C, need_index=True)
+
+
+def bus_shrink(case):
+    on, off, C, spacing = case
+    fix = load_gen("bus").normalize_nonnegative
+    if spacing:
+        yield on, off, C, 0
+    for i in range(len(on)):
+        if len(on) > 1:
+            yield fix(on[:i] + on[i + 1:], off[:i] + off[i + 1:], C) + (C, spacing)
+    for i in range(len(on)):
+        for arr, other, flip in ((on, off, False), (off, on, True)):
+            if arr[i]:
+                smaller = arr[:i] + [arr[i] // 2] + arr[i + 1:]
+                yield (fix(other, smaller, C) if flip else fix(smaller, other, C)) + (C, spacing)
+    for c in (1, C // 2, max(on)):
+        if 1 <= c < C:
+            yield fix(on, off, c) + (c, spacing)
+
+
+# --------------------- feed ---------------------
+# case: (posts, k) with posts [(u, t, l)], (u, t) pairs unique, k >= 1
+
+
+def feed_random(rng, max_n):
+    n = rng.randint(1, max_n)
+    users, times, likes = rng.randint(1, n), rng.randint(1, n), rng.randint(1, 4)
+    pairs = set()
+    while len(pairs) < n:
+        pairs.add((rng.randint(1, users + n), rng.randint(0, times)))
+    posts = [(u, t, rng.randint(0, likes)) for u, t in rng.sample(sorted(pairs), n)]
+    return posts, rng.randint(1, n + 1)
+
+
+def feed_input(case):
+    posts, k = case
+    return f"{len(posts)} {k}\n" + "".join(f"{u} {t} {l}\n" for u, t, l in posts)
+
+
+def feed_answer(case):
+    posts, k = case
+    indexed = [(u, t, l, i + 1) for i, (u, t, l) in enumerate(posts)]
+    return " ".join(map(str, load_gen("feed").solve_reference(indexed, k)))
+
+
+def feed_shrink(case):
+    posts, k = case
+    if k > 1:
+        yield posts, k - 1
+    for i in range(len(posts)):
+        if len(posts) > 1:
+            yield posts[:i] + posts[i + 1:], k
+    for i, (u, t, l) in enumerate(posts):
+        for smaller in ((u, t, l // 2), (u, t // 2, l), (u // 2, t, l)):
+            if smaller != (u, t, l) and smaller[0] >= 1 and \
+                    all(p[:2] != smaller[:2] for p in posts):
+                yield posts[:i] + [smaller] + posts[i + 1:], k
+
+
+# --------------------- tree ---------------------
+# case: (n, edges) of a full binary tree rooted at 1
+
+
+def tree_random(rng, max_n):
+    n = 2 * rng.randint(0, max(0, (max_n - 1) // 2)) + 1
+    leaves, edges, nxt = [1], [], 2
+    while nxt <= n:
+        leaf = leaves.pop(rng.randrange(len(leaves)))
+        edges += [(leaf, nxt), (leaf, nxt + 1)]
+        leaves += [nxt, nxt + 1]
+        nxt += 2
+    labels = [1] + rng.sample(range(2, n + 1), n - 1)  # root stays 1
+    edges = [(labels[u - 1], labels[v - 1]) if rng.random() < 0.5 else
+             (labels[v - 1], labels[u - 1]) for u, v in edges]
+    rng.shuffle(edges)
+    return n, edges
+
+
+def tree_input(case):
+    n, edges = case
+    return f"{n}\n" + "".join(f"{u} {v}\n" for u, v in edges)
+
+
+def tree_answer(case):
+    n, edges = case
+    return "\n".join(" ".join(map(str, order))
+                     for order in load_gen("tree").traversals_from_edges(n, edges))
+
+
+def tree_shrink(case):
+    """Remove a pair of sibling leaves, relabelling to 1..n-2 in label order."""
+    n, edges = case
+    deg = [0] * (n + 1)
+    for u, v in edges:
+        deg[u] += 1
+        deg[v] += 1
+    parent_of = {}
+    for u, v in edges:
+        for child, par in ((u, v), (v, u)):
+            if child != 1 and deg[child] == 1:
+                parent_of[child] = par
+    siblings = {}
+    for child, par in parent_of.items():
+        siblings.setdefault(par, []).append(child)
+    for par, kids in siblings.items():
+        if len(kids) == 2:
+            keep = [x for x in range(1, n + 1) if x not in kids]
+            relabel = {x: i + 1 for i, x in enumerate(keep)}
+            yield n - 2, [(relabel[u], relabel[v]) for u, v in edges
+                          if u not in kids and v not in kids]
+
+
+TARGETS = {
+    "bus": (bus_random, bus_input, bus_answer, bus_shrink),
+    "feed": (feed_random, feed_input, feed_answer, feed_shrink),
+    "tree": (tree_random, tree_input, tree_answer, tree_shrink),
+}
+
+
+# --------------------- Driver ---------------------
+
+
+def normalized(text: str):
+    lines = [line.split() for line in text.splitlines()]
+    while lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+
+class _Timeout(Exception):
+    pass
+
+
+def _alarm(signum, frame):
+    raise _Timeout
+
+
+def _exec_python(code, src, in_fd, out_fd, err_fd):
+    """Child side of run_cases for a Python solution: run code as __main__ and exit."""
+    status = 1
+    try:
+        os.dup2(in_fd, 0)
+        os.dup2(out_fd, 1)
+        os.dup2(err_fd, 2)
+        sys.stdin = open(0, "r", closefd=False)
+        sys.stdout = open(1, "w", closefd=False)
+        sys.stderr = open(2, "w", closefd=False)
+        sys.argv = [src]
+        try:
+            exec(code, {"__name__": "__main__", "__file__": src, "__builtins__": __builtins__})
+            status = 0
+        except SystemExit as e:
+            status = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        sys.stdout.flush()
+    except BaseException:
+        status = status or 1
+    os._exit(status)
+
+
+def run_cases(cmd, inputs):
+    """
+    Outputs of cmd on each input file, from one process: a Python solution
+    is compiled once and run in a forked child per case (no interpreter
+    startup), anything else is started with posix_spawn. Failures come back
+    as "<timeout>" or "<exit code N>".
+    """
+    code = None
+    if cmd[0] == sys.executable and cmd[-1].endswith(".py"):
+        with open(cmd[-1]) as f:
+            code = compile(f.read(), cmd[-1], "exec")
+    outputs = []
+    previous = signal.signal(signal.SIGALRM, _alarm)
+    try:
+        with tempfile.TemporaryFile() as out, open(os.devnull, "wb") as devnull:
+            for path in inputs:
+                out.seek(0)
+                out.truncate()
+                in_fd = os.open(path, os.O_RDONLY)
+                try:
+                    if code is None:
+                        pid = os.posix_spawnp(cmd[0], cmd, os.environ, file_actions=[
+                            (os.POSIX_SPAWN_DUP2, in_fd, 0),
+                            (os.POSIX_SPAWN_DUP2, out.fileno(), 1),
+                            (os.POSIX_SPAWN_DUP2, devnull.fileno(), 2),
+                        ])
+                    else:
+                        sys.stdout.flush()
+                        sys.stderr.flush()
+                        pid = os.fork()
+                        if pid == 0:
+                            _exec_python(code, cmd[-1], in_fd, out.fileno(), devnull.fileno())
+                finally:
+                    os.close(in_fd)
+                signal.setitimer(signal.ITIMER_REAL, CASE_TIMEOUT)
+                try:
+                    _, status = os.waitpid(pid, 0)
+                except _Timeout:
+                    os.kill(pid, signal.SIGKILL)
+                    os.waitpid(pid, 0)
+                    outputs.append("<timeout>")
+                    continue
+                finally:
+                    signal.setitimer(signal.ITIMER_REAL, 0)
+                exit_code = os.waitstatus_to_exitcode(status)
+                if exit_code != 0:
+                    outputs.append(f"<exit code {exit_code}>")
+                    continue
+                out.seek(0)
+                outputs.append(out.read().decode(errors="replace"))
+    finally:
+        signal.signal(signal.SIGALRM, previous)
+    return outputs
+
+
+def run_impl(cmd, data: str):
+    with tempfile.NamedTemporaryFile("w", suffix=".txt") as f:
+        f.write(data)
+        f.flush()
+        return run_cases(cmd, [f.name])[0]
+
+
+def first_mismatch(task, cases, impls):
+    """(position, label) of the first case some implementation gets wrong, or None."""
+    _, make_input, answer, _ = TARGETS[task]
+    expected = [normalized(answer(case)) for case in cases]
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i, case in enumerate(cases):
+            paths.append(os.path.join(tmp, f"{i}.txt"))
+            with open(paths[-1], "w") as f:
+                f.write(make_input(case))
+        bad = None
+        for label, cmd in impls:
+            for i, got in enumerate(run_cases(cmd, paths)):
+                if normalized(got) != expected[i]:
+                    if bad is None or i < bad[0]:
+                        bad = (i, label)
+                    break
+    return bad
+
+
+def mismatch(task, case, impls):
+    """Label of the first implementation disagreeing on case, or None."""
+    bad = first_mismatch(task, [case], impls)
+    return bad and bad[1]
+
+
+def check_batch(task, impls, seed, count, max_n):
+    random_case = TARGETS[task][0]
+    cases = [random_case(random.Random(i), max_n) for i in range(seed, seed + count)]
+    bad = first_mismatch(task, cases, impls)
+    if bad:
+        i, label = bad
+        return seed + i, cases[i], label
+    return None
+
+
+def shrink(task, case, impl):
+    """Greedy shrinking while impl still disagrees with the reference."""
+    shrink_step = TARGETS[task][3]
+    improved = True
+    while improved:
+        improved = False
+        for smaller in shrink_step(case):
+            if mismatch(task, smaller, [impl]):
+                case, improved = smaller, True
+                break
+    return case
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Differential stress testing with shrinking.")
+    parser.add_argument("task", choices=sorted(TARGETS))
+    parser.add_argument("--lang", nargs="+", choices=["c", "cpp", "java", "py"], help="only these languages")
+    parser.add_argument("-n", "--cases", type=int, default=0, help="number of cases (default: until a mismatch)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first case (default: 0)")
+    parser.add_argument("--max-n", type=int, default=8, help="largest generated size (default: 8)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: number of cores)")
+    args = parser.parse_args()
+
+    task = find_tasks([args.task])[0]
+    impls = []
+    for sol in find_solutions(task, args.lang):
+        missing = toolchain_missing(sol)
+        if missing:
+            print(f"{sol.label}: skipped ({missing} not installed)")
+            continue
+        try:
+            impls.append((sol.label, compile_solution(sol)))
+        except CompileError as e:
+            print(e)
+    if not impls:
+        sys.exit("nothing to test")
+    print(f"{args.task}: reference vs {', '.join(label for label, _ in impls)}")
+
+    found, done, start = None, 0, time.perf_counter()
+    next_seed, limit = args.seed, args.seed + args.cases if args.cases else None
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        pending = {}  # future -> number of cases
+        try:
+            while found is None:
+                while len(pending) < 2 * args.jobs and (limit is None or next_seed < limit):
+                    count = BATCH if limit is None else min(BATCH, limit - next_seed)
+                    pending[pool.submit(check_batch, args.task, impls, next_seed, count, args.max_n)] = count
+                    next_seed += count
+                if not pending:
+                    break
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    result = fut.result()
+                    if result and (found is None or result[0] < found[0]):
+                        found = result
+                    done += pending.pop(fut)
+                rate = done / (time.perf_counter() - start)
+                print(f"\r{done} cases, {rate:.0f}/s", end="", flush=True)
+        except KeyboardInterrupt:
+            pool.shutdown(cancel_futures=True)
+            print()
+            return
+        for fut in pending:
+            fut.cancel()
+    print()
+    if found is None:
+        print("no mismatch")
+        return
+
+    seed, case, label = found
+    impl = next(i for i in impls if i[0] == label)
+    small = shrink(args.task, case, impl)
+    _, make_input, answer, _ = TARGETS[args.task]
+    data = make_input(small)
+    path = os.path.join(BUILD_DIR, "stress", f"{args.task}-{os.path.basename(label)}.txt")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(data)
+    print(f"MISMATCH: {label} on case seed {seed} (--seed {seed} -n 1 replays it)")
+    print(f"shrunk input ({path}):\n{data}expected:\n{answer(small)}\ngot:\n{run_impl(impl[1], data)}")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
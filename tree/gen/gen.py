@@ -10,86 +10,250 @@
 #  - ../output/output{index}.txt (inorder, preorder, postorder traversals, each on its own line)
 #
 # Reproducible: fixed seed.
+#
+# --stress builds an extra tier of 1e6–1e7 node trees (beyond the statement
+# limits) into ../stress/input and ../stress/output, one seed per case.
+#
+# Unchanged testcases are skipped via ../../gencache.py (--force rebuilds all).
 
+import argparse
 import random
 import os
 import sys
+from array import array
 from collections import deque
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+import genio
+from gencache import GenCache, dump_state, load_state, rng_digest
+
 random_seed = 2025
 random.seed(random_seed)
 
-sys.setrecursionlimit(1 << 25)
+STRESS_MAX_N = 10**7
+# (n, shape) of the stress tier; n must be odd and <= STRESS_MAX_N
+STRESS_CASES = [
+    (999999, 'balanced'),
+    (999999, 'left-deep'),
+    (999999, 'right-skew'),
+    (999999, 'random'),
+    (999999, 'comb'),
+    (9999999, 'right-skew'),
+    (9999999, 'random'),
+]
 
-def ensure_dirs():
-    os.makedirs("../input", exist_ok=True)
-    os.makedirs("../output", exist_ok=True)
+def ensure_dirs(in_dir="../input", out_dir="../output"):
+    os.makedirs(in_dir, exist_ok=True)
+    os.makedirs(out_dir, exist_ok=True)
 
-def write_case(index, n, edges, inorder, preorder, postorder):
-    inp_path = f"../input/input{index}.txt"
-    out_path = f"../output/output{index}.txt"
-    with open(inp_path, "w") as f:
+def write_case(index, n, edges, inorder, preorder, postorder,
+               in_dir="../input", out_dir="../output"):
+    inp_path = f"{in_dir}/input{index}.txt"
+    out_path = f"{out_dir}/output{index}.txt"
+    with genio.atomic_open(inp_path) as f:
         f.write(f"{n}\n")
-        for u, v in edges:
-            f.write(f"{u} {v}\n")
-    with open(out_path, "w") as f:
-        f.write(" ".join(map(str, inorder)) + "\n")
-        f.write(" ".join(map(str, preorder)) + "\n")
-        f.write(" ".join(map(str, postorder)) + "\n")
+        genio.write_rows(f, edges)
+    with genio.atomic_open(out_path) as f:
+        genio.write_ints(f, inorder)
+        genio.write_ints(f, preorder)
+        genio.write_ints(f, postorder)
 
-def traversals_from_edges(n, edges):
-    # build adjacency
-    adj = [[] for _ in range(n+1)]
+def child_arrays(n, edges):
+    """
+    left[u], right[u] of the tree rooted at 1 (smaller child is left, 0 if
+    absent), without recursion or adjacency lists: a few flat ints per node.
+    """
+    # degree and XOR of neighbours per node; peeling leaves towards the root
+    # leaves acc[v] = parent of v
+    deg = array('i', bytes(4 * (n + 1)))
+    acc = array('i', bytes(4 * (n + 1)))
     for u, v in edges:
-        adj[u].append(v)
-        adj[v].append(u)
-    inorder = []
-    preorder = []
-    postorder = []
-    def dfs(u, p):
-        preorder.append(u)
-        children = [v for v in adj[u] if v != p]
-        children.sort()  # smaller child is left
-        left = children[0] if len(children) >= 1 else None
-        right = children[1] if len(children) == 2 else None
-        if left is not None:
-            dfs(left, u)
-        inorder.append(u)
-        if right is not None:
-            dfs(right, u)
-        postorder.append(u)
-    dfs(1, 0)
+        deg[u] += 1
+        deg[v] += 1
+        acc[u] ^= v
+        acc[v] ^= u
+    stack = array('i', [u for u in range(2, n + 1) if deg[u] == 1])
+    while stack:
+        u = stack.pop()
+        p = acc[u]
+        acc[p] ^= u
+        deg[p] -= 1
+        if deg[p] == 1 and p != 1:
+            stack.append(p)
+        acc[u] = p
+    del deg
+
+    # visiting children by increasing label makes the first one the left
+    left = array('i', bytes(4 * (n + 1)))
+    right = array('i', bytes(4 * (n + 1)))
+    for v in range(2, n + 1):
+        p = acc[v]
+        if left[p] == 0:
+            left[p] = v
+        elif right[p] == 0:
+            right[p] = v
+        else:
+            raise AssertionError(f"Node {p} has more than 2 children. Test generation bug.")
+    del acc
+    return left, right
+
+def traversals(left, right):
+    """Inorder, preorder and postorder from child arrays, in one iterative pass."""
+    # single pass, stack entries are node << 2 | phase
+    # (0 = enter, 1 = between children, 2 = exit)
+    inorder = array('i')
+    preorder = array('i')
+    postorder = array('i')
+    stack = array('i', [1 << 2])
+    while stack:
+        x = stack.pop()
+        u = x >> 2
+        phase = x & 3
+        if phase == 0:
+            preorder.append(u)
+            l = left[u]
+            if l == 0:
+                inorder.append(u)
+                postorder.append(u)
+                continue
+            stack.append(u << 2 | 2)
+            r = right[u]
+            if r:
+                stack.append(r << 2)
+            stack.append(u << 2 | 1)
+            stack.append(l << 2)
+        elif phase == 1:
+            inorder.append(u)
+        else:
+            postorder.append(u)
     return inorder, preorder, postorder
 
-def canonical_edge_signature(edges):
-    # canonical normalized sorted tuple of edges to check duplicates
-    normalized = tuple(sorted(tuple(sorted(e)) for e in edges))
-    return normalized
+def traversals_from_edges(n, edges):
+    return traversals(*child_arrays(n, edges))
+
+MASK64 = (1 << 64) - 1
+LEAF_HASH = 0x243F6A8885A308D3
+
+def _mix(a, b):
+    # splitmix64-style finalizer over an ordered pair of 64-bit hashes
+    x = (a * 0x9E3779B97F4A7C15 + b * 0xC2B2AE3D27D4EB4F + 0x165667B19E3779F9) & MASK64
+    x ^= x >> 31
+    x = (x * 0xBF58476D1CE4E5B9) & MASK64
+    x ^= x >> 29
+    return x
+
+def tree_digest(left, right, preorder, isomorphic=False):
+    """
+    16-byte AHU-style digest of the rooted tree: a node hashes its children's
+    hashes (in left/right order, or sorted when isomorphic=True), bottom-up
+    via reversed preorder. Same shape => same digest, so relabelled copies
+    count as duplicates; with isomorphic=True so do mirrored subtrees.
+    """
+    n = len(left) - 1
+    h = array('Q', bytes(8 * (n + 1)))
+    for i in range(len(preorder) - 1, -1, -1):
+        u = preorder[i]
+        l = left[u]
+        if l == 0:
+            h[u] = LEAF_HASH
+            continue
+        a, b = h[l], h[right[u]]
+        if isomorphic and a > b:
+            a, b = b, a
+        h[u] = _mix(a, b)
+    return n.to_bytes(8, 'little') + h[1].to_bytes(8, 'little')
+
+class RandomLeaves:
+    """
+    Leaf pool for the 'random' shape of the committed tests, which must keep
+    their exact trees: the old list only ever appended new (increasing)
+    labels, so it was always sorted and leaves.pop(idx) took the idx-th
+    smallest live leaf, and any other removal order (such as swap-with-last)
+    expands different leaves for the same randrange draws. Here a Fenwick
+    tree over labels 1..n answers that in O(log n). Labels not created yet
+    are counted as present: they are larger than every live leaf, so they
+    never get picked and appending needs no update.
+    Trees without that constraint (the stress tier) use SwapLeaves.
+    """
+    def __init__(self, n):
+        self.n = n
+        fw = [0] + [1] * n
+        for i in range(1, n + 1):  # O(n) build of the all-ones tree
+            j = i + (i & -i)
+            if j <= n:
+                fw[j] += fw[i]
+        self.fw = fw
+        self.top = 1 << (n.bit_length() - 1)
+        self.size = 1  # live leaves; starts with the root
+
+    def __len__(self):
+        return self.size
+
+    def append(self, label):
+        self.size += 1
+
+    def pop(self, idx):
+        fw, n = self.fw, self.n
+        # binary lifting: largest pos with prefix(pos) <= idx, label = pos + 1
+        pos, rem, step = 0, idx + 1, self.top
+        while step:
+            nxt = pos + step
+            if nxt <= n and fw[nxt] < rem:
+                pos = nxt
+                rem -= fw[nxt]
+            step >>= 1
+        label = pos + 1
+        i = label
+        while i <= n:
+            fw[i] -= 1
+            i += i & -i
+        self.size -= 1
+        return label
+
+class SwapLeaves(array):
+    """Unordered leaf pool: pop(idx) moves the last leaf into the hole, O(1)."""
+    def pop(self, idx):
+        last = super().pop()
+        if idx == len(self):
+            return last
+        leaf, self[idx] = self[idx], last
+        return leaf
 
 # Generate a full binary tree of size n = 1 + 2*t (t expansions).
 # shape controls which leaf we expand next:
 #  - 'balanced' : BFS expansion (queue) -> near-perfect
-#  - 'left-skew' : always expand the oldest leaf (simulate deep-left)
+#  - 'left-skew' : historical name, builds the same trees as 'right-skew'
+#    (kept so the committed tests do not change)
 #  - 'right-skew' : always expand the newest leaf (deep-right)
+#  - 'left-deep' : always expand the left child of the last expansion
 #  - 'random' : pick a random current leaf to expand
 #  - 'comb' : alternate expanding a deep path and then shallow leaf -> comb-like
-def generate_full_binary_tree(n, shape='random'):
+# Every shape runs in O(n) ('random' in O(n log n)), with the same trees as
+# the original list-based version for the same random state; with
+# keep_order=False 'random' takes O(n) too, but draws other trees.
+# The tree is returned as one flat array: the children of node u are
+# left[u] and left[u] + 1 (labels are handed out in pairs), or none if
+# left[u] == 0. tree_edges() streams its edges.
+def generate_full_binary_tree(n, shape='random', keep_order=True):
     assert n % 2 == 1 and n >= 1
+    left = array('i', bytes(4 * (n + 1)))
     if n == 1:
-        return [[] for _ in range(2)]  # nodes 1..1, but we return list sized n+1 (indexing convenience)
-    total_nodes = n
-    # We'll maintain:
-    # nodes: integer labels from 1..n assigned as we create them
-    # parent -> children mapping: children_list
-    children = [[] for _ in range(n + 1)]
+        return left
     # start with root node 1 as a leaf
     next_label = 2  # next node id to assign
-    # leaves list: store node ids that are leaves (available to be expanded)
-    # We'll use deque for 'balanced', list for 'right-skew' (stack-like), etc.
-    if shape == 'balanced':
+    # leaves: node ids that are leaves (available to be expanded)
+    #  - deque for 'balanced' and 'comb' (both ends are taken)
+    #  - array('i') used as a stack for the skews and 'left-deep'
+    #  - RandomLeaves (order statistics) for 'random' and the fallback,
+    #    SwapLeaves when the exact trees do not matter
+    if shape in ('balanced', 'comb'):
         leaves = deque([1])
+    elif shape in ('left-skew', 'right-skew', 'left-deep'):
+        leaves = array('i', [1])
+    elif keep_order:
+        leaves = RandomLeaves(n)
     else:
-        leaves = [1]
+        leaves = SwapLeaves('i', [1])
 
     expansions_needed = (n - 1) // 2
     # for comb shape we use a toggle
@@ -99,59 +263,44 @@ def generate_full_binary_tree(n, shape='random'):
         # pick which leaf to expand
         if shape == 'balanced':
             leaf = leaves.popleft()
-        elif shape == 'left-skew':
-            # expand the left-most leaf (the earliest added) -> use pop(0)
-            leaf = leaves.pop(0)
-        elif shape == 'right-skew':
-            # expand the most recently added leaf -> stack behavior
+        elif shape in ('left-skew', 'right-skew', 'left-deep'):
+            # left-skew used to pop(0) after insert(0, left), insert(0, right):
+            # that is the same stack discipline as right-skew, mirrored to the
+            # list's front. Using the end keeps the trees and makes it O(1).
             leaf = leaves.pop()
         elif shape == 'comb':
             if comb_toggle:
                 leaf = leaves.pop()  # deep path
             else:
-                leaf = leaves.pop(0)  # shallow
+                leaf = leaves.popleft()  # shallow
             comb_toggle = not comb_toggle
-        elif shape == 'random':
-            idx = random.randrange(len(leaves))
-            leaf = leaves.pop(idx)
-        else:
-            # default fallback: random
+        else:  # 'random' or fallback
             idx = random.randrange(len(leaves))
             leaf = leaves.pop(idx)
 
-        # create two children and attach to leaf
+        # create two children and attach to leaf; the smaller label is the
+        # left child when the tree is read back (child_arrays)
         left_child = next_label
         right_child = next_label + 1
         next_label += 2
-        # we will not reorder labels: left_child will be smaller than right_child by construction
-        # but when interpreting children for traversal we sort children ascending anyway.
-        children[leaf].extend([left_child, right_child])
-        # add new leaves into leaves structure
-        if shape == 'balanced':
-            leaves.append(left_child)
-            leaves.append(right_child)
-        elif shape == 'left-skew':
-            # to make deep-left, add new children so left stays at front
-            leaves.insert(0, left_child)
-            leaves.insert(0, right_child)
-        elif shape == 'right-skew':
-            leaves.append(left_child)
+        left[leaf] = left_child
+        # add new leaves into leaves structure (order matters for skew/comb)
+        if shape == 'left-deep':
             leaves.append(right_child)
-        elif shape == 'comb':
-            # add both but order matters for comb effect
             leaves.append(left_child)
-            leaves.append(right_child)
-        else:  # random or fallback
+        else:
             leaves.append(left_child)
             leaves.append(right_child)
-    # Build edges (parent-child)
-    edges = []
-    for u in range(1, n+1):
-        for v in children[u]:
-            edges.append((u, v))
     # final sanity: next_label should be n+1
     assert next_label == n+1, f"label mismatch next_label={next_label} expected {n+1}"
-    return children, edges
+    return left
+
+def tree_edges(left):
+    """(parent, child) edges of generate_full_binary_tree's tree, by parent, smaller child first."""
+    for u, l in enumerate(left):
+        if l:
+            yield u, l
+            yield u, l + 1
 
 def make_unique_testcases():
     # We'll build exactly 26 testcases.
@@ -183,62 +332,137 @@ def make_unique_testcases():
     assert len(testcases) == 26
     return testcases
 
+def build_case(index, n, shape, seen_signatures, isomorphic):
+    """Generate, check and write testcase index; returns its cache metadata."""
+    if n == 1:
+        # trivial single node
+        edges = []
+    elif n == 3:
+        # unique full binary tree
+        edges = [(1,2), (1,3)]
+    else:
+        # generate the tree and its edges using our generator
+        edges = list(tree_edges(generate_full_binary_tree(n, shape=shape)))
+        # edges are directed parent->child (u,v). ok for input (undirected)
+    # compute traversals
+    left, right = child_arrays(n, edges)
+    inorder, preorder, postorder = traversals(left, right)
+
+    # fixed-size structural digest to ensure we don't accidentally repeat structure
+    sig = tree_digest(left, right, preorder, isomorphic)
+    if sig in seen_signatures:
+        print(f"Warning: duplicate detected for n={n}, shape={shape}. Regenerating with random shuffle.")
+        # regenerate as random shape and different labelling
+        edges = list(tree_edges(generate_full_binary_tree(n, shape='random')))
+        left, right = child_arrays(n, edges)
+        inorder, preorder, postorder = traversals(left, right)
+        sig = tree_digest(left, right, preorder, isomorphic)
+        if sig in seen_signatures:
+            raise RuntimeError("Couldn't produce unique testcase for n=%d" % n)
+    seen_signatures.add(sig)
+    del left, right
+
+    # Quick validity check: each node must have 0 or 2 children when rooted at 1.
+    adj = [[] for _ in range(n+1)]
+    for u,v in edges:
+        adj[u].append(v)
+        adj[v].append(u)
+    def child_count_rooted():
+        counts = [0]*(n+1)
+        stack = [(1,0)]
+        while stack:
+            u,p = stack.pop()
+            cnt = 0
+            for v in adj[u]:
+                if v == p: continue
+                cnt += 1
+                stack.append((v,u))
+            counts[u] = cnt
+        return counts
+    counts = child_count_rooted()
+    for u in range(1, n+1):
+        if counts[u] not in (0,2):
+            raise AssertionError(f"Node {u} in tree n={n} has {counts[u]} children (not 0 or 2). Test generation bug.")
+
+    write_case(index, n, edges, inorder, preorder, postorder)
+    print(f"Written testcase {index}: n={n}, shape={shape}, edges={len(edges)}")
+    return {"sig": sig.hex()}
+
+def build_stress_case(index, n, shape, in_dir, out_dir):
+    assert n % 2 == 1 and n <= STRESS_MAX_N
+    random.seed(random_seed * 1000 + index)
+    # no edge list or adjacency: the generator's child array is the tree,
+    # and the edges are streamed from it while the input is written
+    left = generate_full_binary_tree(n, shape=shape, keep_order=False)
+    right = array('i', (l + 1 if l else 0 for l in left))
+    inorder, preorder, postorder = traversals(left, right)
+    del right
+    write_case(index, n, tree_edges(left), inorder, preorder, postorder, in_dir, out_dir)
+    print(f"Written stress testcase {index}: n={n}, shape={shape}")
+
+# Everything a case's files depend on besides (n, shape) and the RNG state
+CACHE_DEPS = [
+    generate_full_binary_tree, RandomLeaves, SwapLeaves, tree_edges, child_arrays, traversals,
+    tree_digest, _mix, LEAF_HASH, write_case, build_case, build_stress_case,
+    genio.write_ints, genio.write_rows,
+]
+
+def main_stress(cache):
+    in_dir, out_dir = "../stress/input", "../stress/output"
+    ensure_dirs(in_dir, out_dir)
+    for index, (n, shape) in enumerate(STRESS_CASES):
+        paths = [f"{in_dir}/input{index}.txt", f"{out_dir}/output{index}.txt"]
+        built, _ = cache.run(f"stress/{index}", paths, cache.key(n, shape, random_seed),
+                             lambda: build_stress_case(index, n, shape, in_dir, out_dir))
+        if not built:
+            print(f"Unchanged stress testcase {index}: n={n}, shape={shape}")
+    cache.save()
+    genio.sync_dirs()
+    print(f"Generated {len(STRESS_CASES)} stress testcases in ../stress.")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate Binary Tree Traversal tests.")
+    parser.add_argument("--stress", action="store_true",
+                        help=f"build the large tier (n up to {STRESS_MAX_N}) into ../stress")
+    parser.add_argument("--dedup-isomorphic", action="store_true",
+                        help="treat trees equal up to swapping children as duplicates")
+    parser.add_argument("--force", action="store_true",
+                        help="rebuild every case, ignoring the generation cache")
+    parser.add_argument("--fsync", action="store_true",
+                        help="fsync written files and (once per run) their directories")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    genio.configure(args.fsync)
+    cache = GenCache(__file__, deps=CACHE_DEPS, enabled=not args.force)
+    if args.stress:
+        main_stress(cache)
+        return
+    isomorphic = args.dedup_isomorphic
     ensure_dirs()
     testcases = make_unique_testcases()
     seen_signatures = set()
     index = 0
     for (n, shape) in testcases:
-        if n == 1:
-            # trivial single node
-            edges = []
-        elif n == 3:
-            # unique full binary tree
-            edges = [(1,2), (1,3)]
+        paths = [f"../input/input{index}.txt", f"../output/output{index}.txt"]
+        # the shared random state decides this case too
+        key = cache.key(n, shape, isomorphic, rng_digest(random))
+        cached = cache.fresh(index, key, paths)
+        if cached and bytes.fromhex(cache.meta(index)["sig"]) in seen_signatures:
+            cached = False  # an earlier case changed into this one: rebuild
+        if cached:
+            meta = cache.meta(index)
+            random.setstate(load_state(meta["rng"]))
+            seen_signatures.add(bytes.fromhex(meta["sig"]))
+            print(f"Unchanged testcase {index}: n={n}, shape={shape}")
         else:
-            # generate children and edges using our generator
-            children, edges = generate_full_binary_tree(n, shape=shape)
-            # edges returned are directed parent->child (u,v). ok for input (undirected)
-        # canonical signature to ensure we don't accidentally repeat structure
-        sig = canonical_edge_signature(edges)
-        if sig in seen_signatures:
-            print(f"Warning: duplicate detected for n={n}, shape={shape}. Regenerating with random shuffle.")
-            # regenerate as random shape and different labelling
-            children, edges = generate_full_binary_tree(n, shape='random')
-            sig = canonical_edge_signature(edges)
-            if sig in seen_signatures:
-                raise RuntimeError("Couldn't produce unique testcase for n=%d" % n)
-        seen_signatures.add(sig)
-
-        # compute traversals
-        inorder, preorder, postorder = traversals_from_edges(n, edges)
-
-        # Quick validity check: each node must have 0 or 2 children when rooted at 1.
-        adj = [[] for _ in range(n+1)]
-        for u,v in edges:
-            adj[u].append(v)
-            adj[v].append(u)
-        def child_count_rooted():
-            counts = [0]*(n+1)
-            stack = [(1,0)]
-            while stack:
-                u,p = stack.pop()
-                cnt = 0
-                for v in adj[u]:
-                    if v == p: continue
-                    cnt += 1
-                    stack.append((v,u))
-                counts[u] = cnt
-            return counts
-        counts = child_count_rooted()
-        for u in range(1, n+1):
-            if counts[u] not in (0,2):
-                raise AssertionError(f"Node {u} in tree n={n} has {counts[u]} children (not 0 or 2). Test generation bug.")
-
-        write_case(index, n, edges, inorder, preorder, postorder)
-        print(f"Written testcase {index}: n={n}, shape={shape}, edges={len(edges)}")
+            meta = build_case(index, n, shape, seen_signatures, isomorphic)
+            cache.store(index, key, paths, rng=dump_state(random.getstate()), **meta)
         index += 1
 
+    cache.save()
+    genio.sync_dirs()
     assert index == 26
     print(f"Generated {index} unique testcases (seed={random_seed}).")
 
@@ -1,40 +1,75 @@
 import sys
+from array import array
 
-data = list(map(int, sys.stdin.buffer.read().split()))
-it = iter(data)
-n = next(it)
-adj = [[] for _ in range(n + 1)]
-for _ in range(n - 1):
-  u = next(it)
-  v = next(it)
-  adj[u].append(v)
-  adj[v].append(u)
-for neighbours in adj:
-  neighbours.sort()
-
-sys.setrecursionlimit(max(1000000, 2 * n + 10))
-
-_in, pre, post = [], [], []
-
-def dfs(u, p):
-  pre.append(u)
-  vis = 0
-  for v in adj[u]:
-    if v == p:
-      continue
-    if vis == 1:
+
+def main():
+  it = map(int, sys.stdin.buffer.read().split())
+  n = next(it)
+
+  # degree and XOR of neighbours; peeling leaves towards the root 1
+  # leaves acc[v] = parent of v
+  deg = array('i', bytes(4 * (n + 1)))
+  acc = array('i', bytes(4 * (n + 1)))
+  for u, v in zip(it, it):
+    deg[u] += 1
+    deg[v] += 1
+    acc[u] ^= v
+    acc[v] ^= u
+  del it
+
+  stack = array('i', [u for u in range(2, n + 1) if deg[u] == 1])
+  while stack:
+    u = stack.pop()
+    p = acc[u]
+    acc[p] ^= u
+    deg[p] -= 1
+    if deg[p] == 1 and p != 1:
+      stack.append(p)
+    acc[u] = p
+  del deg
+
+  # children in increasing label order: the first one is the left child
+  left = array('i', bytes(4 * (n + 1)))
+  right = array('i', bytes(4 * (n + 1)))
+  for v in range(2, n + 1):
+    p = acc[v]
+    if left[p] == 0:
+      left[p] = v
+    else:
+      right[p] = v
+  del acc
+
+  # one iterative pass, stack entries are node << 2 | phase
+  # (0 = enter, 1 = between children, 2 = exit)
+  _in, pre, post = array('i'), array('i'), array('i')
+  stack.append(1 << 2)
+  while stack:
+    x = stack.pop()
+    u = x >> 2
+    phase = x & 3
+    if phase == 0:
+      pre.append(u)
+      l = left[u]
+      if l == 0:
+        _in.append(u)
+        post.append(u)
+        continue
+      stack.append(u << 2 | 2)
+      if right[u]:
+        stack.append(right[u] << 2)
+        stack.append(u << 2 | 1)
+      stack.append(l << 2)
+    elif phase == 1:
       _in.append(u)
-    vis += 1
-    dfs(v, u)
-  if vis == 0:
-    _in.append(u)
-  post.append(u)
-
-dfs(1, 0)
-
-out = [
-  ' '.join(map(str, _in)),
-  ' '.join(map(str, pre)),
-  ' '.join(map(str, post)),
-]
-sys.stdout.write('\n'.join(out))
\ No newline at end of file
+    else:
+      post.append(u)
+
+  out = [
+    ' '.join(map(str, _in)),
+    ' '.join(map(str, pre)),
+    ' '.join(map(str, post)),
+  ]
+  sys.stdout.write('\n'.join(out))
+
+
+main()